@@ -282,6 +282,7 @@ async def upload_pdf(
                 contents,
                 file.filename,
                 ai_metadata,
+                pdf_text=pdf_text,
             )
             print(f"🎫 Generated {len(pkpass_files)} pass files")
             if warnings:
@@ -1,6 +1,5 @@
 """Barcode and QR code extraction from PDF files."""
 
-import io
 import os
 import re
 import logging
@@ -39,6 +38,71 @@ import PyPDF2
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# pyzbar type -> Apple Wallet barcode format, built once at import
+_PK_FORMAT_MAP = {
+    'QRCODE': 'PKBarcodeFormatQR',
+    'PDF417': 'PKBarcodeFormatPDF417', 
+    'CODE128': 'PKBarcodeFormatCode128',
+    'AZTEC': 'PKBarcodeFormatAztec',
+    'CODE39': 'PKBarcodeFormatCode128',  # Fallback to Code128
+    'CODE93': 'PKBarcodeFormatCode128',  # Fallback to Code128
+    'EAN13': 'PKBarcodeFormatCode128',   # Fallback to Code128
+    'EAN8': 'PKBarcodeFormatCode128',    # Fallback to Code128
+    'UPC_A': 'PKBarcodeFormatCode128',   # Fallback to Code128
+    'UPC_E': 'PKBarcodeFormatCode128',   # Fallback to Code128
+    'CODABAR': 'PKBarcodeFormatCode128', # Fallback to Code128
+    'ITF': 'PKBarcodeFormatCode128',     # Fallback to Code128
+    'DATAMATRIX': 'PKBarcodeFormatQR'   # Fallback to QR
+}
+
+# Our format names -> zbar symbol names; zbar has no Aztec or Data Matrix reader
+_ZBAR_SYMBOL_NAMES = {
+    'QRCODE': 'QRCODE',
+    'PDF417': 'PDF417',
+    'CODE128': 'CODE128',
+    'CODE39': 'CODE39',
+    'CODE93': 'CODE93',
+    'CODABAR': 'CODABAR',
+    'EAN8': 'EAN8',
+    'EAN13': 'EAN13',
+    'UPC_A': 'UPCA',
+    'UPC_E': 'UPCE',
+    'ITF': 'I25',
+}
+
+# Resolved symbol lists per format set, filled on first use
+_zbar_symbols_cache: Dict[frozenset, List[Any]] = {}
+
+
+def _zbar_symbols(formats: Set[str]) -> List[Any]:
+    """zbar symbols to enable for *formats*; empty when zbar reads none of them.
+
+    Only enabling the requested symbologies spares zbar running every 1D and
+    2D scanner on each image when a format group only wants one of them.
+    """
+    key = frozenset(formats)
+    if key not in _zbar_symbols_cache:
+        names = [_ZBAR_SYMBOL_NAMES[f] for f in key if f in _ZBAR_SYMBOL_NAMES]
+        _zbar_symbols_cache[key] = [pyzbar.ZBarSymbol[n] for n in names]
+    return _zbar_symbols_cache[key]
+
+
+def _pil_to_bgr(image: Image.Image) -> np.ndarray:
+    """BGR array for an RGB PIL image.
+
+    A reversed-channel view of the pixel buffer: one copy out of PIL instead
+    of np.array's extra copy plus a cvtColor allocation. The view is
+    read-only, which is fine since nothing downstream writes into it.
+    """
+    return np.asarray(image)[..., ::-1]
+
+
+def _to_gray(image: np.ndarray) -> np.ndarray:
+    """Grayscale version of a BGR image; 2-D images are already gray."""
+    if image.ndim == 2:
+        return image
+    return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+
 
 class BarcodeExtractor:
     """Extract barcodes and QR codes from PDF files."""
@@ -157,7 +221,8 @@ class BarcodeExtractor:
         """Decode barcodes from image with specific format constraints.
         
         Args:
-            image: OpenCV image array
+            image: OpenCV image array (BGR or single-channel grayscale; pyzbar
+                takes either as-is)
             formats: Set of barcode formats to try (e.g., {'AZTEC'})
             try_harder: Enable enhanced detection (unused with pyzbar, kept for ZXing compatibility)
             
@@ -166,9 +231,14 @@ class BarcodeExtractor:
         """
         barcodes = []
         
+        # zbar has no reader for these formats (e.g. Aztec, Data Matrix alone)
+        symbols = _zbar_symbols(formats)
+        if not symbols:
+            return barcodes
+        
         try:
-            # Use pyzbar to detect all barcodes, then filter by formats
-            detected_barcodes = pyzbar.decode(image)
+            # Let pyzbar scan only for the requested formats, then filter by them
+            detected_barcodes = pyzbar.decode(image, symbols=symbols)
             
             for barcode in detected_barcodes:
                 if barcode.type in formats:
@@ -232,11 +302,10 @@ class BarcodeExtractor:
             
             # Get page as image
             pix = page.get_pixmap(matrix=fitz.Matrix(300/72, 300/72))  # 300 DPI for reliable barcode detection
-            img_data = pix.tobytes("png")
             
-            # Convert to PIL Image and then to OpenCV format
-            pil_image = Image.open(io.BytesIO(img_data))
-            cv_image = cv2.cvtColor(np.array(pil_image), cv2.COLOR_RGB2BGR)
+            # Wrap the raw RGB samples directly (no PNG round trip) as a BGR view
+            rgb = np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.height, pix.width, pix.n)
+            cv_image = rgb[..., ::-1]
             
             # Detect barcodes
             page_barcodes = self._decode_barcodes(cv_image, page_num + 1)
@@ -272,7 +341,7 @@ class BarcodeExtractor:
                 page_barcodes = []
                 for page_num, image in enumerate(images, 1):
                     # Convert PIL to OpenCV
-                    cv_image = cv2.cvtColor(np.array(image), cv2.COLOR_RGB2BGR)
+                    cv_image = _pil_to_bgr(image)
                     
                     # Try enhanced preprocessing if no barcodes found yet
                     if not barcodes:
@@ -325,6 +394,15 @@ class BarcodeExtractor:
             'Code39': 'PKBarcodeFormatCode128',
             'DataMatrix': 'PKBarcodeFormatQR',
         }
+        # zxing-cpp format names → the type names the rest of the pipeline uses
+        zxing_type_map = {
+            'PDF417': 'PDF417',
+            'QRCode': 'QRCODE',
+            'Aztec': 'AZTEC',
+            'Code128': 'CODE128',
+            'Code39': 'CODE39',
+            'DataMatrix': 'DATAMATRIX',
+        }
 
         barcodes = []
         doc = fitz.open(stream=pdf_data, filetype="pdf")
@@ -338,7 +416,8 @@ class BarcodeExtractor:
 
             results = zxingcpp.read_barcodes(img)
             for b in results:
-                fmt_name = str(b.format)  # e.g. "PDF417"
+                # Enum name, e.g. "DataMatrix"; str() is "Data Matrix" in newer zxing-cpp
+                fmt_name = b.format.name
                 pk_format = zxing_format_map.get(fmt_name, 'PKBarcodeFormatQR')
 
                 # Use raw bytes — more reliable than .text for binary payloads
@@ -360,7 +439,7 @@ class BarcodeExtractor:
 
                 barcode_info = {
                     'data': data,
-                    'type': fmt_name,
+                    'type': zxing_type_map.get(fmt_name, fmt_name.upper()),
                     'format': pk_format,
                     'encoding': 'utf-8',
                     'raw_bytes': raw,
@@ -394,8 +473,9 @@ class BarcodeExtractor:
         )
         
         for page_num, image in enumerate(images, 1):
-            # Convert PIL to OpenCV
-            cv_image = cv2.cvtColor(np.array(image), cv2.COLOR_RGB2BGR)
+            # Every enhancement works on grayscale: convert once per page
+            # rather than once per method
+            gray_image = _to_gray(_pil_to_bgr(image))
             
             # Try multiple image enhancement techniques
             enhancement_methods = [
@@ -408,7 +488,7 @@ class BarcodeExtractor:
             
             for enhance_method in enhancement_methods:
                 try:
-                    enhanced_image = enhance_method(cv_image)
+                    enhanced_image = enhance_method(gray_image)
                     page_barcodes = self._decode_barcodes(enhanced_image, page_num, f"enhanced_{enhance_method.__name__}")
                     barcodes.extend(page_barcodes)
                 except Exception as e:
@@ -464,44 +544,44 @@ class BarcodeExtractor:
     
     def _enhance_contrast(self, image: np.ndarray) -> np.ndarray:
         """Enhance image contrast."""
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        gray = _to_gray(image)
         return cv2.convertScaleAbs(gray, alpha=1.5, beta=0)
     
     def _enhance_sharpness(self, image: np.ndarray) -> np.ndarray:
         """Enhance image sharpness."""
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        gray = _to_gray(image)
         kernel = np.array([[-1,-1,-1], [-1,9,-1], [-1,-1,-1]])
         return cv2.filter2D(gray, -1, kernel)
     
     def _enhance_threshold(self, image: np.ndarray) -> np.ndarray:
         """Apply adaptive threshold."""
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        gray = _to_gray(image)
         return cv2.adaptiveThreshold(gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 11, 2)
     
     def _enhance_morphology(self, image: np.ndarray) -> np.ndarray:
         """Apply morphological operations."""
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        gray = _to_gray(image)
         kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (3, 3))
         return cv2.morphologyEx(gray, cv2.MORPH_CLOSE, kernel)
     
     def _enhance_gaussian_blur(self, image: np.ndarray) -> np.ndarray:
         """Apply Gaussian blur to reduce noise."""
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        gray = _to_gray(image)
         return cv2.GaussianBlur(gray, (3, 3), 0)
     
     def _preprocess_for_barcode_detection(self, image: np.ndarray) -> Dict[str, np.ndarray]:
         """Apply various preprocessing techniques for better barcode detection.
         
         Args:
-            image: Original OpenCV image
+            image: Original OpenCV image (BGR or grayscale)
             
         Returns:
             Dictionary of processed images with method names
         """
         processed = {}
         
-        # Convert to grayscale first
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        # Convert to grayscale first (no-op for an already gray image)
+        gray = _to_gray(image)
         processed['grayscale'] = gray
         
         # Otsu thresholding
@@ -578,23 +658,7 @@ class BarcodeExtractor:
         Returns:
             Normalized format for Apple Wallet
         """
-        format_mapping = {
-            'QRCODE': 'PKBarcodeFormatQR',
-            'PDF417': 'PKBarcodeFormatPDF417', 
-            'CODE128': 'PKBarcodeFormatCode128',
-            'AZTEC': 'PKBarcodeFormatAztec',
-            'CODE39': 'PKBarcodeFormatCode128',  # Fallback to Code128
-            'CODE93': 'PKBarcodeFormatCode128',  # Fallback to Code128
-            'EAN13': 'PKBarcodeFormatCode128',   # Fallback to Code128
-            'EAN8': 'PKBarcodeFormatCode128',    # Fallback to Code128
-            'UPC_A': 'PKBarcodeFormatCode128',   # Fallback to Code128
-            'UPC_E': 'PKBarcodeFormatCode128',   # Fallback to Code128
-            'CODABAR': 'PKBarcodeFormatCode128', # Fallback to Code128
-            'ITF': 'PKBarcodeFormatCode128',     # Fallback to Code128
-            'DATAMATRIX': 'PKBarcodeFormatQR'   # Fallback to QR
-        }
-        
-        return format_mapping.get(barcode_type, 'PKBarcodeFormatQR')
+        return _PK_FORMAT_MAP.get(barcode_type, 'PKBarcodeFormatQR')
     
     def _calculate_confidence(self, barcode) -> int:
         """Calculate confidence score for barcode detection.
@@ -37,19 +37,19 @@ class PassGenerator:
         self.assets_path = assets_path or os.path.join(os.path.dirname(__file__), "../../assets")
         self.signing_enabled = self._check_certificates_available()
         
-    def create_basic_pass(self, 
-                         title: str = "Generic Pass", 
-                         description: str = "Generated from PDF",
-                         organization: str = "Add2Wallet") -> bytes:
-        """Create a basic Apple Wallet pass.
+    def _build_basic_pass_json(self,
+                               title: str = "Generic Pass",
+                               description: str = "Generated from PDF",
+                               organization: str = "Add2Wallet") -> Dict[str, Any]:
+        """Assemble the pass.json dict for create_basic_pass without packaging it.
         
         Args:
             title: Pass title
-            description: Pass description  
+            description: Pass description
             organization: Organization name
             
         Returns:
-            bytes: The .pkpass file as bytes
+            Dict[str, Any]: The pass.json contents
         """
         
         # Extract identifiers from certificate
@@ -105,6 +105,25 @@ class PassGenerator:
             pass_json["associatedStoreIdentifiers"] = associated_store_ids
             print(f"✅ Added associatedStoreIdentifiers: {associated_store_ids}")
         
+        return pass_json
+    
+    def create_basic_pass(self, 
+                         title: str = "Generic Pass", 
+                         description: str = "Generated from PDF",
+                         organization: str = "Add2Wallet") -> bytes:
+        """Create a basic Apple Wallet pass.
+        
+        Args:
+            title: Pass title
+            description: Pass description  
+            organization: Organization name
+            
+        Returns:
+            bytes: The .pkpass file as bytes
+        """
+        
+        pass_json = self._build_basic_pass_json(title, description, organization)
+        
         # Create temporary directory for pass files
         with tempfile.TemporaryDirectory() as temp_dir:
             
@@ -120,7 +139,7 @@ class PassGenerator:
             manifest = self._create_manifest(temp_dir)
             manifest_path = os.path.join(temp_dir, "manifest.json")
             with open(manifest_path, 'w') as f:
-                json.dump(manifest, f, indent=2)
+                json.dump(manifest, f, separators=(",", ":"))
             
             # Sign the manifest if certificates are available
             if self.signing_enabled:
@@ -202,13 +221,17 @@ class PassGenerator:
     def create_pass_from_pdf_data(self, 
                                  pdf_data: bytes, 
                                  filename: str,
-                                 ai_metadata: Dict[str, Any] = None) -> Tuple[List[bytes], List[Dict[str, Any]], List[Dict[str, Any]], List[str]]:
+                                 ai_metadata: Dict[str, Any] = None,
+                                 pdf_text: Optional[str] = None,
+                                 barcodes: Optional[List[Dict[str, Any]]] = None) -> Tuple[List[bytes], List[Dict[str, Any]], List[Dict[str, Any]], List[str]]:
         """Create intelligent passes from PDF data, supporting multiple tickets.
         
         Args:
             pdf_data: Raw PDF bytes
             filename: Original filename
             ai_metadata: AI-extracted metadata (optional)
+            pdf_text: Text already extracted from pdf_data (optional, avoids re-parsing the PDF)
+            barcodes: Barcodes already extracted from pdf_data (optional, skips extraction)
             
         Returns:
             Tuple of (list of .pkpass files as bytes, list of detected barcodes, list of ticket info, list of warnings)
@@ -218,14 +241,18 @@ class PassGenerator:
         # Initialize warnings list to collect from all passes
         all_warnings = []
         
-        # Step 1: Extract barcodes from PDF
-        barcodes: List[Dict[str, Any]] = []
-        try:
-            from app.services.barcode_extractor import barcode_extractor
-            barcodes = barcode_extractor.extract_barcodes_from_pdf(pdf_data, filename)
-            print(f"📊 Found {len(barcodes)} barcodes in PDF")
-        except Exception as e:
-            print(f"⚠️ Barcode extraction failed: {e}")
+        # Step 1: Extract barcodes from PDF unless the caller already did
+        if barcodes is None:
+            barcodes = []
+            try:
+                from app.services.barcode_extractor import barcode_extractor
+                barcodes = barcode_extractor.extract_barcodes_from_pdf(pdf_data, filename)
+                print(f"📊 Found {len(barcodes)} barcodes in PDF")
+            except Exception as e:
+                print(f"⚠️ Barcode extraction failed: {e}")
+        else:
+            # Sorted in place below; leave the caller's list alone
+            barcodes = list(barcodes)
         
         # Sort barcodes by page then by detected area (descending)
         try:
@@ -246,8 +273,9 @@ class PassGenerator:
             base_pass_info = ai_metadata
         else:
             print("🔄 Falling back to basic PDF analysis")
-            # Extract text content from PDF
-            pdf_text = self._extract_pdf_text(pdf_data)
+            # Extract text content from PDF unless the caller already did
+            if pdf_text is None:
+                pdf_text = self._extract_pdf_text(pdf_data)
             print(f"📝 Extracted {len(pdf_text)} characters of text")
             
             # Analyze PDF content to extract pass information
@@ -303,6 +331,8 @@ class PassGenerator:
         # Step 4: Generate passes for each ticket
         pkpass_files = []
         ticket_info = []
+        # Rasterized palette is the same for every ticket; computed on first use
+        pdf_palette = None
         
         for ticket in tickets:
             ticket_barcode = ticket['barcode']
@@ -336,13 +366,15 @@ class PassGenerator:
             else:
                 # Fall back to PDF image extraction
                 print(f"🎨 AI colors not available, extracting from PDF...")
-                pdf_bg, pdf_fg, pdf_label = self._extract_color_palette_from_pdf_images(pdf_data)
+                if pdf_palette is None:
+                    pdf_palette = self._extract_color_palette_from_pdf_images(pdf_data)
+                pdf_bg, pdf_fg, pdf_label = pdf_palette
                 
                 if pdf_bg and pdf_fg and pdf_label:
                     bg_color, fg_color, label_color = pdf_bg, pdf_fg, pdf_label
                     print(f"✅ Using PDF-extracted colors: bg={bg_color}")
                 else:
-                    bg_color, fg_color, label_color = self._analyze_pdf_colors_enhanced(pdf_data, pass_info)
+                    bg_color, fg_color, label_color = self._analyze_pdf_colors_enhanced(pdf_data, pass_info, pdf_text)
                     print(f"🔄 Using fallback color analysis")
             
             # Use AI-extracted title or fallback, then sanitize to avoid code-like titles
@@ -891,7 +923,7 @@ class PassGenerator:
             manifest = self._create_manifest(temp_dir)
             manifest_path = os.path.join(temp_dir, "manifest.json")
             with open(manifest_path, 'w') as f:
-                json.dump(manifest, f, indent=2)
+                json.dump(manifest, f, separators=(",", ":"))
             
             # Sign the manifest if certificates are available
             if self.signing_enabled:
@@ -1335,12 +1367,14 @@ class PassGenerator:
             print(f"❌ Error extracting PDF text: {e}")
             return ""
     
-    def _analyze_pdf_colors_enhanced(self, pdf_data: bytes, pass_info: Dict[str, Any]) -> Tuple[str, str, str]:
+    def _analyze_pdf_colors_enhanced(self, pdf_data: bytes, pass_info: Dict[str, Any],
+                                     pdf_text: Optional[str] = None) -> Tuple[str, str, str]:
         """Enhanced PDF color analysis using AI metadata.
         
         Args:
             pdf_data: Raw PDF bytes
             pass_info: AI-extracted pass information
+            pdf_text: Already-extracted PDF text (optional)
             
         Returns:
             tuple: (background_color, foreground_color, label_color)
@@ -1371,13 +1405,14 @@ class PassGenerator:
             return "rgb(50, 173, 230)", "rgb(255, 255, 255)", "rgb(255, 255, 255)"  # Business blue
         else:
             # Fall back to original color analysis
-            return self._analyze_pdf_colors(pdf_data)
+            return self._analyze_pdf_colors(pdf_data, pdf_text)
     
-    def _analyze_pdf_colors(self, pdf_data: bytes) -> Tuple[str, str, str]:
+    def _analyze_pdf_colors(self, pdf_data: bytes, pdf_text: Optional[str] = None) -> Tuple[str, str, str]:
         """Analyze PDF to suggest color palette.
         
         Args:
             pdf_data: Raw PDF bytes
+            pdf_text: Already-extracted PDF text (optional)
             
         Returns:
             tuple: (background_color, foreground_color, label_color)
@@ -1386,7 +1421,9 @@ class PassGenerator:
         # This is a simplified approach - full implementation would analyze actual PDF colors
         
         try:
-            text = self._extract_pdf_text(pdf_data).lower()
+            if pdf_text is None:
+                pdf_text = self._extract_pdf_text(pdf_data)
+            text = pdf_text.lower()
             
             # Simple color inference based on content type
             if any(word in text for word in ['ferry', 'barco', 'buque', 'embarque', 'vessel']):
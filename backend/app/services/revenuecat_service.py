@@ -1,6 +1,10 @@
 import os
+import threading
+import time
 import uuid as uuid_mod
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from typing import Optional, Dict, Any, Tuple
 from dotenv import load_dotenv
 import logging
@@ -10,6 +14,16 @@ load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+# Circuit breaker: after this many consecutive upstream failures, skip calls
+# to RevenueCat for the cooldown period instead of waiting on timeouts.
+BREAKER_FAILURE_THRESHOLD = 5
+BREAKER_COOLDOWN_SECONDS = 30.0
+
+# (connect, read) timeout per attempt. With one retry a call is bounded at
+# about 2 x 9s, so a dead upstream trips the breaker quickly.
+REQUEST_TIMEOUT = (3.05, 6)
+REQUEST_RETRIES = 1
+
 class RevenueCatService:
     """Service for interacting with RevenueCat API"""
     
@@ -26,6 +40,58 @@ class RevenueCatService:
         else:
             logger.warning("RevenueCat secret key not found in environment variables")
             self.headers = {}
+
+        # Pooled session so repeated calls reuse the TLS connection. Rate limits
+        # and transient 5xx are retried once in-place; Retry-After is ignored
+        # so a long server-requested wait can't stall the request. POST
+        # retries are safe because deductions carry an Idempotency-Key.
+        retry = Retry(
+            total=REQUEST_RETRIES,
+            backoff_factor=0.5,
+            status_forcelist=[429, 502, 503, 504],
+            respect_retry_after_header=False,
+            allowed_methods=frozenset(["POST", "GET"]),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(max_retries=retry, pool_connections=10, pool_maxsize=20)
+        self.session = requests.Session()
+        self.session.mount("https://", adapter)
+
+        # Shared by concurrent requests, so updates happen under the lock
+        self._breaker = {"failures": 0, "open_until": 0.0}
+        self._breaker_lock = threading.Lock()
+
+    def _breaker_open(self) -> bool:
+        return time.monotonic() < self._breaker["open_until"]
+
+    def _record_failure(self) -> None:
+        with self._breaker_lock:
+            self._breaker["failures"] += 1
+            failures = self._breaker["failures"]
+            if failures >= BREAKER_FAILURE_THRESHOLD:
+                self._breaker["open_until"] = time.monotonic() + BREAKER_COOLDOWN_SECONDS
+        if failures >= BREAKER_FAILURE_THRESHOLD:
+            logger.error(
+                "[CIRCUIT OPEN] %d consecutive RevenueCat failures, skipping calls for %.0fs",
+                failures, BREAKER_COOLDOWN_SECONDS,
+            )
+
+    def _record_success(self) -> None:
+        with self._breaker_lock:
+            self._breaker["failures"] = 0
+            self._breaker["open_until"] = 0.0
+
+    def _record_response(self, status_code: int) -> None:
+        """Update the breaker from a response left after retries.
+
+        Rate limiting and 5xx count as upstream failures. Other 4xx answers
+        (insufficient balance, unknown user) mean RevenueCat is up but are not
+        a success either, so they leave the breaker as it is.
+        """
+        if status_code == 429 or status_code >= 500:
+            self._record_failure()
+        elif status_code < 400:
+            self._record_success()
     
     def deduct_pass(self, user_id: str, is_retry: bool = False, job_id: Optional[str] = None) -> Tuple[bool, Optional[int]]:
         """
@@ -57,9 +123,13 @@ class RevenueCatService:
             logger.error("[DEDUCT_PASS INVALID_USER] user_id=%r is empty/blank, returning False", user_id)
             return False, None
 
+        if self._breaker_open():
+            logger.warning("[DEDUCT_PASS SKIP] circuit open, returning True to unblock user=%s", user_id)
+            return True, None
+
         from urllib.parse import quote
         encoded_user_id = quote(user_id, safe="")
-        logger.info("[DEDUCT_PASS URL] raw=%r encoded=%r", user_id, encoded_user_id)
+        logger.debug("[DEDUCT_PASS URL] raw=%r encoded=%r", user_id, encoded_user_id)
         url = f"{self.base_url}/projects/projd85d45ec/customers/{encoded_user_id}/virtual_currencies/transactions"
         payload = {
             "adjustments": {
@@ -70,16 +140,19 @@ class RevenueCatService:
         idempotency_key = job_id if job_id else str(uuid_mod.uuid4())
         request_headers = {**self.headers, "Idempotency-Key": idempotency_key}
 
-        logger.info("[DEDUCT_PASS REQUEST] url=%s idempotency_key=%s", url, idempotency_key)
-        logger.info("[DEDUCT_PASS REQUEST] payload=%s", payload)
+        logger.debug("[DEDUCT_PASS REQUEST] url=%s idempotency_key=%s", url, idempotency_key)
+        logger.debug("[DEDUCT_PASS REQUEST] payload=%s", payload)
 
         try:
-            response = requests.post(url, json=payload, headers=request_headers, timeout=10)
+            response = self.session.post(url, json=payload, headers=request_headers, timeout=REQUEST_TIMEOUT)
 
-            logger.info(
-                "[DEDUCT_PASS RESPONSE] status=%d headers=%s body=%s",
-                response.status_code, dict(response.headers), response.text,
-            )
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(
+                    "[DEDUCT_PASS RESPONSE] status=%d headers=%s body=%s",
+                    response.status_code, dict(response.headers), response.text,
+                )
+
+            self._record_response(response.status_code)
 
             if response.status_code == 200:
                 logger.info("[DEDUCTION OK] user=%s", user_id)
@@ -109,6 +182,7 @@ class RevenueCatService:
                 return False, None
 
         except requests.exceptions.RequestException as e:
+            self._record_failure()
             logger.error(
                 "[NETWORK ERROR] user=%s exception=%s — returning True (silent fail to unblock)",
                 user_id, e,
@@ -137,16 +211,23 @@ class RevenueCatService:
             logger.warning("[GET_BALANCE SKIP] secret_key not configured")
             return None
 
+        if self._breaker_open():
+            logger.warning("[GET_BALANCE SKIP] circuit open user=%s", user_id)
+            return None
+
         try:
             from urllib.parse import quote
             encoded_user_id = quote(user_id, safe="")
             url = f"{self.base_url}/projects/projd85d45ec/customers/{encoded_user_id}"
-            response = requests.get(url, headers=self.headers, timeout=10)
+            response = self.session.get(url, headers=self.headers, timeout=REQUEST_TIMEOUT)
 
-            logger.info(
-                "[GET_BALANCE RESPONSE] status=%d body=%s",
-                response.status_code, response.text[:2000],
-            )
+            self._record_response(response.status_code)
+
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(
+                    "[GET_BALANCE RESPONSE] status=%d body=%s",
+                    response.status_code, response.text[:2000],
+                )
 
             if response.status_code == 200:
                 data = response.json()
@@ -158,6 +239,10 @@ class RevenueCatService:
                 logger.error("[GET_BALANCE FAILED] user=%s status=%d body=%s", user_id, response.status_code, response.text)
                 return None
 
+        except requests.exceptions.RequestException as e:
+            self._record_failure()
+            logger.error("[GET_BALANCE ERROR] user=%s exception=%s", user_id, e)
+            return None
         except Exception as e:
             logger.error("[GET_BALANCE ERROR] user=%s exception=%s", user_id, e, exc_info=True)
             return None
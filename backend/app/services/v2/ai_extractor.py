@@ -7,9 +7,10 @@ the web or invent data — only what is explicitly present in the document.
 
 from __future__ import annotations
 
+import asyncio
 import json
 import os
-from typing import Optional
+from typing import List, Optional, Tuple, Union
 
 from app.services.v2.models import PDFExtraction
 
@@ -64,11 +65,18 @@ class AIExtractor:
         self.api_key = api_key or os.getenv("OPENAI_API_KEY")
         self.enabled = bool(self.api_key)
         self._client = None
+        self._aclient = None
+        self._use_parse = False
 
         if self.enabled:
             try:
                 from openai import OpenAI
                 self._client = OpenAI(api_key=self.api_key, timeout=30.0)
+                # Structured-output parse() needs OpenAI SDK >= 1.40; decide once
+                # which request style to use instead of probing on every call.
+                self._use_parse = hasattr(self._client, "beta") and hasattr(
+                    self._client.beta.chat.completions, "parse"
+                )
                 print("🤖 AI extractor v2 initialised")
             except Exception as exc:
                 print(f"❌ Failed to init OpenAI client: {exc}")
@@ -89,73 +97,145 @@ class AIExtractor:
             print(f"⚠️ AI extraction failed ({exc}) — using heuristic fallback")
             return _heuristic_extract(text, filename)
 
-    def _call_openai(self, text: str, filename: str) -> PDFExtraction:
-        model = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
-        prompt = _EXTRACTION_PROMPT.format(
-            filename=filename,
-            text=text[:4000],
+    async def extract_many(
+        self, jobs: List[Tuple[str, str]]
+    ) -> List[Union[PDFExtraction, BaseException]]:
+        """Run extractions for several (text, filename) pairs concurrently.
+
+        Results are returned in input order; a failed job yields its exception
+        instead of aborting the whole batch.
+        """
+        return await asyncio.gather(
+            *[self._aextract(text, filename) for text, filename in jobs],
+            return_exceptions=True,
         )
 
-        # Prefer structured output (OpenAI SDK >= 1.40)
+    async def _aextract(self, text: str, filename: str) -> PDFExtraction:
+        """Async counterpart of extract()."""
+        if not self.enabled:
+            print("🔄 AI disabled — using heuristic extraction")
+            return _heuristic_extract(text, filename)
+
         try:
+            return await self._acall_openai(text, filename)
+        except Exception as exc:
+            print(f"⚠️ AI extraction failed ({exc}) — using heuristic fallback")
+            return _heuristic_extract(text, filename)
+
+    def _call_openai(self, text: str, filename: str) -> PDFExtraction:
+        model, prompt = _request_params(text, filename)
+
+        if self._use_parse:
             resp = self._client.beta.chat.completions.parse(  # type: ignore[attr-defined]
-                model=model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": (
-                            "You extract structured information from ticket and pass documents. "
-                            "Only return information explicitly present in the text."
-                        ),
-                    },
-                    {"role": "user", "content": prompt},
-                ],
-                response_format=PDFExtraction,
-                temperature=0.0,
-                max_tokens=600,
+                **_parse_kwargs(model, prompt)
             )
-            result: PDFExtraction = resp.choices[0].message.parsed  # type: ignore[union-attr]
-            print(
-                f"✅ AI extraction complete: type={result.document_type}, "
-                f"title='{result.title}', confidence={result.confidence}"
+            return _parsed_result(resp)
+
+        # Older SDKs: manual JSON schema
+        resp = self._client.chat.completions.create(**_json_schema_kwargs(model, prompt))
+        return _json_schema_result(resp)
+
+    def _async_client(self):
+        """AsyncOpenAI client, created on first async use.
+
+        It keeps its own connection pool, so sync-only callers never pay for it.
+        """
+        if self._aclient is None:
+            from openai import AsyncOpenAI
+            self._aclient = AsyncOpenAI(api_key=self.api_key, timeout=30.0, max_retries=2)
+        return self._aclient
+
+    async def _acall_openai(self, text: str, filename: str) -> PDFExtraction:
+        model, prompt = _request_params(text, filename)
+        client = self._async_client()
+
+        if self._use_parse:
+            resp = await client.beta.chat.completions.parse(  # type: ignore[attr-defined]
+                **_parse_kwargs(model, prompt)
             )
-            return result
-        except Exception:
-            pass
-
-        # Fallback: manual JSON schema
-        resp = self._client.chat.completions.create(
-            model=model,
-            messages=[
-                {
-                    "role": "system",
-                    "content": (
-                        "You extract structured information from ticket and pass documents. "
-                        "Only return information explicitly present in the text. "
-                        "Return valid JSON matching the provided schema exactly."
-                    ),
-                },
-                {"role": "user", "content": prompt},
-            ],
-            response_format={
-                "type": "json_schema",
-                "json_schema": {
-                    "name": "pdf_extraction",
-                    "schema": _JSON_SCHEMA,
-                    "strict": True,
-                },
+            return _parsed_result(resp)
+
+        resp = await client.chat.completions.create(**_json_schema_kwargs(model, prompt))
+        return _json_schema_result(resp)
+
+
+# ---------------------------------------------------------------------------
+# OpenAI request/response helpers (shared by the sync and async clients)
+# ---------------------------------------------------------------------------
+
+def _request_params(text: str, filename: str) -> Tuple[str, str]:
+    model = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+    prompt = _EXTRACTION_PROMPT.format(
+        filename=filename,
+        text=text[:4000],
+    )
+    return model, prompt
+
+
+def _parse_kwargs(model: str, prompt: str) -> dict:
+    return dict(
+        model=model,
+        messages=[
+            {
+                "role": "system",
+                "content": (
+                    "You extract structured information from ticket and pass documents. "
+                    "Only return information explicitly present in the text."
+                ),
             },
-            temperature=0.0,
-            max_tokens=600,
-        )
-        raw = resp.choices[0].message.content or "{}"
-        data = json.loads(raw)
-        result = PDFExtraction(**data)
-        print(
-            f"✅ AI extraction complete (json_schema): type={result.document_type}, "
-            f"title='{result.title}', confidence={result.confidence}"
-        )
-        return result
+            {"role": "user", "content": prompt},
+        ],
+        response_format=PDFExtraction,
+        temperature=0.0,
+        max_tokens=600,
+    )
+
+
+def _parsed_result(resp) -> PDFExtraction:
+    result: PDFExtraction = resp.choices[0].message.parsed  # type: ignore[union-attr]
+    print(
+        f"✅ AI extraction complete: type={result.document_type}, "
+        f"title='{result.title}', confidence={result.confidence}"
+    )
+    return result
+
+
+def _json_schema_kwargs(model: str, prompt: str) -> dict:
+    return dict(
+        model=model,
+        messages=[
+            {
+                "role": "system",
+                "content": (
+                    "You extract structured information from ticket and pass documents. "
+                    "Only return information explicitly present in the text. "
+                    "Return valid JSON matching the provided schema exactly."
+                ),
+            },
+            {"role": "user", "content": prompt},
+        ],
+        response_format={
+            "type": "json_schema",
+            "json_schema": {
+                "name": "pdf_extraction",
+                "schema": _JSON_SCHEMA,
+                "strict": True,
+            },
+        },
+        temperature=0.0,
+        max_tokens=600,
+    )
+
+
+def _json_schema_result(resp) -> PDFExtraction:
+    raw = resp.choices[0].message.content or "{}"
+    data = json.loads(raw)
+    result = PDFExtraction(**data)
+    print(
+        f"✅ AI extraction complete (json_schema): type={result.document_type}, "
+        f"title='{result.title}', confidence={result.confidence}"
+    )
+    return result
 
 
 # ---------------------------------------------------------------------------
@@ -6,6 +6,18 @@ import os
 import re
 from typing import Optional, Tuple
 
+try:
+    import fitz  # type: ignore
+    FITZ_AVAILABLE = True
+except ImportError:
+    FITZ_AVAILABLE = False
+
+try:
+    from PIL import Image, ImageDraw, ImageFont  # type: ignore
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
 RGBTuple = Tuple[int, int, int]
 
 
@@ -17,14 +29,18 @@ def generate_assets(
     bg_color: str,
     fg_color: str,
     assets_path: Optional[str] = None,
+    pdf_doc: Optional["fitz.Document"] = None,
 ) -> None:
     """Write icon.png, icon@2x.png, icon@3x.png (and optionally thumbnail.png)
     into *pass_dir*.
 
+    If *pdf_doc* is given it is used for the thumbnail instead of re-parsing
+    *pdf_bytes*; the caller keeps ownership and closes it.
+
     Falls back to static icons from *assets_path* if dynamic generation fails.
     """
     try:
-        _generate_dynamic(pass_dir, pdf_bytes, document_type, title, bg_color, fg_color)
+        _generate_dynamic(pass_dir, pdf_bytes, document_type, title, bg_color, fg_color, pdf_doc)
     except Exception as exc:
         print(f"⚠️ Dynamic asset generation failed: {exc} — using static icons")
         _copy_static(pass_dir, assets_path)
@@ -41,8 +57,10 @@ def _generate_dynamic(
     title: str,
     bg_color: str,
     fg_color: str,
+    pdf_doc: Optional["fitz.Document"] = None,
 ) -> None:
-    from PIL import Image, ImageDraw, ImageFont  # type: ignore
+    if not PIL_AVAILABLE:
+        raise RuntimeError("Pillow is not installed")
 
     bg = _parse_rgb(bg_color) or (0, 122, 255)
     fg = _parse_rgb(fg_color) or (255, 255, 255)
@@ -64,27 +82,33 @@ def _generate_dynamic(
         img.save(os.path.join(pass_dir, name), format="PNG")
 
     # Thumbnail from first PDF page
-    if pdf_bytes:
-        thumb = _render_thumbnail(pdf_bytes)
+    if pdf_bytes or pdf_doc is not None:
+        thumb = _render_thumbnail(pdf_bytes, pdf_doc)
         if thumb is not None:
             thumb.thumbnail((180, 180))
             thumb.save(os.path.join(pass_dir, "thumbnail.png"), format="PNG")
             print("🖼️ Generated thumbnail from PDF")
 
 
-def _render_thumbnail(pdf_bytes: bytes):
-    try:
-        import fitz  # type: ignore
-        from PIL import Image  # type: ignore
-
-        doc = fitz.open(stream=pdf_bytes, filetype="pdf")
-        if doc.page_count:
-            pix = doc.load_page(0).get_pixmap(matrix=fitz.Matrix(1.5, 1.5))
-            return Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
-        doc.close()
-    except Exception:
-        pass
+def _render_thumbnail(pdf_bytes: Optional[bytes], pdf_doc: Optional["fitz.Document"] = None):
+    if FITZ_AVAILABLE:
+        try:
+            doc = pdf_doc if pdf_doc is not None else fitz.open(stream=pdf_bytes, filetype="pdf")
+            try:
+                if doc.page_count:
+                    pix = doc.load_page(0).get_pixmap(matrix=fitz.Matrix(1.5, 1.5), alpha=False)
+                    return Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
+            finally:
+                if doc is not pdf_doc:
+                    doc.close()
+        except Exception:
+            pass
 
+    if not pdf_bytes:
+        return None
+
+    # Only pay for the pdf2image import (and Poppler discovery) when PyMuPDF
+    # is missing or could not render the page.
     try:
         from pdf2image import convert_from_bytes  # type: ignore
 
@@ -137,8 +161,11 @@ def _copy_static(pass_dir: str, assets_path: Optional[str]) -> None:
 # Helpers
 # ---------------------------------------------------------------------------
 
+_RGB_RE = re.compile(r"rgb\((\d+),\s*(\d+),\s*(\d+)\)")
+
+
 def _parse_rgb(s: str) -> Optional[RGBTuple]:
-    m = re.match(r"rgb\((\d+),\s*(\d+),\s*(\d+)\)", s)
+    m = _RGB_RE.match(s)
     if not m:
         return None
     return int(m.group(1)), int(m.group(2)), int(m.group(3))
@@ -59,13 +59,17 @@ def extract_barcodes(
 
         pk_format = BARCODE_FORMAT_MAP.get(source_type, "PKBarcodeFormatQR")
 
-        # Prefer raw bytes for message fidelity (use latin-1 mapping)
+        # Prefer raw bytes for message fidelity (use latin-1 mapping).
+        # Most payloads are 7-bit ASCII, which decodes identically and faster;
+        # latin-1 is only needed for the rest.
         raw_bytes: bytes | None = bc.get("raw_bytes")
         if raw_bytes is not None and isinstance(raw_bytes, (bytes, bytearray)):
+            if not isinstance(raw_bytes, bytes):
+                raw_bytes = bytes(raw_bytes)
             try:
-                message = bytes(raw_bytes).decode("latin-1")
-            except Exception:
-                message = bc.get("data", "")
+                message = raw_bytes.decode("ascii")
+            except UnicodeDecodeError:
+                message = raw_bytes.decode("latin-1")
         else:
             message = str(bc.get("data", "")).replace("\r\n", "\n").strip("\n")
 
@@ -2,10 +2,20 @@
 
 from __future__ import annotations
 
+import hashlib
 import re
-from collections import Counter
+import threading
+from collections import OrderedDict
+from functools import lru_cache
 from typing import Optional, Tuple
 
+import numpy as np
+
+try:
+    import fitz  # type: ignore
+except ImportError:  # PyMuPDF is not installed on the Vercel build
+    fitz = None
+
 # WCAG AA minimum contrast ratio for normal text
 WCAG_AA_RATIO = 4.5
 
@@ -23,19 +33,35 @@ _DEFAULT_PALETTE = ("rgb(0, 122, 255)", "rgb(255, 255, 255)", "rgb(255, 255, 255
 
 RGBTuple = Tuple[int, int, int]
 ColorTriple = Tuple[str, str, str]
+ExtractedColors = Tuple[Optional[str], Optional[str], Optional[str]]
+
+# Rasterizing and quantizing pages dominates extract_colors, so results are
+# memoized per PDF content (retries and reprocessing hit the same bytes).
+_CACHE_MAXSIZE = 128
+_extraction_cache: "OrderedDict[str, ExtractedColors]" = OrderedDict()
+_extraction_cache_lock = threading.Lock()
 
 
 def extract_colors(
     pdf_bytes: bytes,
     document_type: str = "generic",
+    use_pdf_colors: bool = True,
+    pdf_doc: Optional["fitz.Document"] = None,
 ) -> ColorTriple:
     """Return (bg, fg, label) color strings for a pass.
 
-    1. Try to extract dominant non-white/black color from PDF pixels.
+    1. Try to extract dominant non-white/black color from PDF pixels
+       (skipped when *use_pdf_colors* is False).
     2. Fall back to event-type defaults if extraction fails.
     3. Always ensure WCAG AA contrast (4.5:1) for fg/label over bg.
+
+    An already-open *pdf_doc* is rendered from instead of re-parsing
+    *pdf_bytes*; it is left open for the caller.
     """
-    bg, fg, label = _extract_from_pdf(pdf_bytes)
+    if use_pdf_colors:
+        bg, fg, label = _extract_from_pdf_cached(pdf_bytes, pdf_doc)
+    else:
+        bg, fg, label = None, None, None
 
     if bg is None:
         bg, fg, label = _EVENT_DEFAULTS.get(document_type, _DEFAULT_PALETTE)
@@ -47,7 +73,7 @@ def extract_colors(
     # Final contrast check
     bg_t = _parse_rgb(bg)
     fg_t = _parse_rgb(fg)
-    if bg_t and fg_t and _contrast_ratio(bg_t, fg_t) < WCAG_AA_RATIO:
+    if bg_t and fg_t and not _meets_wcag(bg_t, fg_t):
         print(f"⚠️ Contrast {_contrast_ratio(bg_t, fg_t):.2f}:1 < {WCAG_AA_RATIO}:1 — switching fg")
         fg, label = _pick_text_colors(bg)
 
@@ -58,41 +84,72 @@ def extract_colors(
 # Internal
 # ---------------------------------------------------------------------------
 
-def _extract_from_pdf(pdf_bytes: bytes) -> Tuple[Optional[str], Optional[str], Optional[str]]:
-    """Rasterize first 2 pages and find dominant non-white/black color."""
-    try:
-        from PIL import Image  # type: ignore
+def _extract_from_pdf_cached(
+    pdf_bytes: bytes,
+    pdf_doc: Optional["fitz.Document"] = None,
+) -> ExtractedColors:
+    """LRU-cached wrapper around _extract_from_pdf keyed by a content digest.
 
-        images = _rasterize(pdf_bytes)
-        if not images:
-            return None, None, None
+    Only successful extractions are cached.
+    """
+    key = hashlib.blake2b(pdf_bytes, digest_size=16).hexdigest()
+    with _extraction_cache_lock:
+        cached = _extraction_cache.get(key)
+        if cached is not None:
+            _extraction_cache.move_to_end(key)
+            return cached
+
+    result = _extract_from_pdf(pdf_bytes, pdf_doc)
+    if result[0] is None:
+        # Failures may be transient (e.g. a rendering error), so don't pin them
+        return result
+    with _extraction_cache_lock:
+        _extraction_cache[key] = result
+        if len(_extraction_cache) > _CACHE_MAXSIZE:
+            _extraction_cache.popitem(last=False)
+    return result
+
+
+def _extract_from_pdf(
+    pdf_bytes: bytes,
+    pdf_doc: Optional["fitz.Document"] = None,
+) -> ExtractedColors:
+    """Rasterize up to the first 2 pages and find dominant non-white/black color.
 
-        counter: Counter = Counter()
-        for img in images:
-            img = img.convert("RGB")
-            img.thumbnail((400, 400))
-            quantized = img.convert("P", palette=Image.ADAPTIVE, colors=16)
-            palette = quantized.getpalette()
-            for pixel in quantized.getdata():
-                if palette and pixel * 3 + 2 < len(palette):
-                    r = palette[pixel * 3]
-                    g = palette[pixel * 3 + 1]
-                    b = palette[pixel * 3 + 2]
-                    counter[(r, g, b)] += 1
-
-        if not counter:
+    Pixels are binned into a 4096-entry histogram (4 bits per channel) and
+    the most common useful bin wins; its center is used as the color.
+    """
+    try:
+        useful = _useful_bin_mask()
+        counts = np.zeros(_HIST_BINS, dtype=np.int64)
+        total = 0
+        for start in range(_MAX_PAGES):
+            pages = _rasterize_np(pdf_bytes, pdf_doc=pdf_doc, start=start, stop=start + 1)
+            if not pages:
+                break
+            for pixels in pages:
+                arr = pixels >> 4
+                codes = (
+                    (arr[:, 0].astype(np.uint16) << 8)
+                    | (arr[:, 1].astype(np.uint16) << 4)
+                    | arr[:, 2]
+                )
+                counts += np.bincount(codes, minlength=_HIST_BINS)
+                total += codes.size
+            # Page 1 usually carries the brand color; only render more pages
+            # when no useful color covers a meaningful share of it.
+            if counts[useful].max() >= _DOMINANT_MIN_SHARE * total:
+                break
+
+        if total == 0:
             return None, None, None
 
-        valid = [
-            (color, count)
-            for color, count in counter.most_common()
-            if _is_useful_bg_color(color)
-        ]
-
-        if not valid:
+        counts[~useful] = 0
+        best = int(np.argmax(counts))
+        if counts[best] == 0:
             return None, None, None
 
-        bg_rgb = valid[0][0]
+        bg_rgb = _bin_color(best)
         fg, label = _pick_text_colors(f"rgb({bg_rgb[0]}, {bg_rgb[1]}, {bg_rgb[2]})")
         return f"rgb({bg_rgb[0]}, {bg_rgb[1]}, {bg_rgb[2]})", fg, label
 
@@ -101,30 +158,46 @@ def _extract_from_pdf(pdf_bytes: bytes) -> Tuple[Optional[str], Optional[str], O
         return None, None, None
 
 
-def _rasterize(pdf_bytes: bytes):
-    """Try PyMuPDF then pdf2image to get PIL images of the first 2 pages."""
-    try:
-        import fitz  # type: ignore
-        from PIL import Image  # type: ignore
-
-        doc = fitz.open(stream=pdf_bytes, filetype="pdf")
-        pages = min(doc.page_count, 2)
-        images = []
-        for i in range(pages):
-            pix = doc.load_page(i).get_pixmap(matrix=fitz.Matrix(2.0, 2.0))
-            images.append(Image.frombytes("RGB", [pix.width, pix.height], pix.samples))
-        doc.close()
-        if images:
-            return images
-    except Exception:
-        pass
+def _rasterize_np(
+    pdf_bytes: bytes,
+    scale: float = 0.5,
+    pdf_doc: Optional["fitz.Document"] = None,
+    start: int = 0,
+    stop: int = 2,
+):
+    """Render pages [start, stop) as (N, 3) uint8 RGB pixel arrays.
+
+    Tries PyMuPDF then pdf2image. Pages are rendered directly at *scale*
+    (0.5 ≈ 300×420 px for A4), which is plenty for picking a dominant color.
+    PyMuPDF samples are viewed as NumPy arrays without going through PIL.
+    """
+    if fitz is not None:
+        try:
+            doc = pdf_doc if pdf_doc is not None else fitz.open(stream=pdf_bytes, filetype="pdf")
+            try:
+                pages = []
+                for i in range(start, min(doc.page_count, stop)):
+                    pix = doc.load_page(i).get_pixmap(matrix=fitz.Matrix(scale, scale), alpha=False)
+                    if pix.n != 3:
+                        pix = fitz.Pixmap(fitz.csRGB, pix)
+                    pages.append(np.frombuffer(pix.samples, dtype=np.uint8).reshape(-1, 3))
+            finally:
+                if doc is not pdf_doc:
+                    doc.close()
+            # An empty result past page 1 just means the PDF is shorter
+            if pages or start > 0:
+                return pages
+        except Exception:
+            pass
 
     try:
         from pdf2image import convert_from_bytes  # type: ignore
 
         return [
-            im.convert("RGB")
-            for im in convert_from_bytes(pdf_bytes, first_page=1, last_page=2, dpi=150)
+            np.asarray(im.convert("RGB"), dtype=np.uint8).reshape(-1, 3)
+            for im in convert_from_bytes(
+                pdf_bytes, first_page=start + 1, last_page=stop, dpi=int(72 * scale)
+            )
         ]
     except Exception:
         pass
@@ -132,15 +205,28 @@ def _rasterize(pdf_bytes: bytes):
     return []
 
 
-def _is_useful_bg_color(c: RGBTuple) -> bool:
-    r, g, b = c
-    if min(r, g, b) > 240:
-        return False  # white-ish
-    if max(r, g, b) < 15:
-        return False  # black-ish
-    if (r + g + b) / 3 > 230:
-        return False  # too light
-    return True
+_HIST_BINS = 1 << 12
+_MAX_PAGES = 2
+# Minimum share of pixels the best useful color needs before later pages are skipped
+_DOMINANT_MIN_SHARE = 0.05
+
+
+def _bin_color(idx: int) -> RGBTuple:
+    """Center color of a 4-bit-per-channel histogram bin."""
+    return ((idx >> 8) << 4) | 8, (((idx >> 4) & 0xF) << 4) | 8, ((idx & 0xF) << 4) | 8
+
+
+@lru_cache(maxsize=1)
+def _useful_bin_mask():
+    """Boolean mask over histogram bins whose color is a usable background."""
+    idx = np.arange(_HIST_BINS)
+    r = ((idx >> 8) << 4) | 8
+    g = (((idx >> 4) & 0xF) << 4) | 8
+    b = ((idx & 0xF) << 4) | 8
+    not_white = np.minimum(np.minimum(r, g), b) <= 240
+    not_black = np.maximum(np.maximum(r, g), b) >= 15
+    not_too_light = (r + g + b) <= 3 * 230
+    return not_white & not_black & not_too_light
 
 
 def _pick_text_colors(bg: str) -> Tuple[str, str]:
@@ -155,12 +241,18 @@ def _pick_text_colors(bg: str) -> Tuple[str, str]:
     return "rgb(255, 255, 255)", "rgb(255, 255, 255)"
 
 
-def _luminance(c: RGBTuple) -> float:
-    def lin(x: float) -> float:
-        return x / 12.92 if x <= 0.03928 else ((x + 0.055) / 1.055) ** 2.4
+def _srgb_to_linear(v: int) -> float:
+    x = v / 255.0
+    return x / 12.92 if x <= 0.03928 else ((x + 0.055) / 1.055) ** 2.4
+
+
+# Linearized value for every 8-bit sRGB channel level
+_SRGB_LUT: Tuple[float, ...] = tuple(_srgb_to_linear(v) for v in range(256))
 
-    r, g, b = (v / 255.0 for v in c)
-    return 0.2126 * lin(r) + 0.7152 * lin(g) + 0.0722 * lin(b)
+
+def _luminance(c: RGBTuple) -> float:
+    r, g, b = c
+    return 0.2126 * _SRGB_LUT[r] + 0.7152 * _SRGB_LUT[g] + 0.0722 * _SRGB_LUT[b]
 
 
 def _contrast_ratio(c1: RGBTuple, c2: RGBTuple) -> float:
@@ -171,8 +263,24 @@ def _contrast_ratio(c1: RGBTuple, c2: RGBTuple) -> float:
     return (lighter + 0.05) / (darker + 0.05)
 
 
+def _meets_wcag(c1: RGBTuple, c2: RGBTuple, ratio: float = WCAG_AA_RATIO) -> bool:
+    """True if the contrast between c1 and c2 is at least *ratio*.
+
+    Same test as _contrast_ratio(c1, c2) >= ratio, cross-multiplied to avoid
+    the division.
+    """
+    l1 = _luminance(c1)
+    l2 = _luminance(c2)
+    if l1 < l2:
+        l1, l2 = l2, l1
+    return l1 + 0.05 >= ratio * (l2 + 0.05)
+
+
+_RGB_RE = re.compile(r"rgb\((\d+),\s*(\d+),\s*(\d+)\)")
+
+
 def _parse_rgb(s: str) -> Optional[RGBTuple]:
-    m = re.match(r"rgb\((\d+),\s*(\d+),\s*(\d+)\)", s)
+    m = _RGB_RE.match(s)
     if not m:
         return None
     return int(m.group(1)), int(m.group(2)), int(m.group(3))
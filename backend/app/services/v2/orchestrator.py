@@ -9,16 +9,24 @@ from __future__ import annotations
 
 import json
 import os
+import shutil
 import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any, Dict, List, Tuple
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 from app.services.v2.ai_extractor import ai_extractor
 from app.services.v2.asset_generator import generate_assets
 from app.services.v2.barcode_pipeline import extract_barcodes
 from app.services.v2.color_extractor import extract_colors
 from app.services.v2.models import ExtractedBarcode, PDFExtraction, PassJSON
 from app.services.v2.pass_builder import build_pass
-from app.services.v2.pass_signer import get_signer
+from app.services.v2.pass_signer import PassSigner, get_signer
 from app.services.v2.pass_validator import validate_pass
 from app.services.v2.pdf_analyzer import analyze_pdf
 
@@ -36,12 +44,34 @@ def create_passes_v2(
         warnings          — human-readable warning strings
     """
     print(f"🔍 [v2] Processing: {filename}")
+    # Parse the PDF once and share the document between text extraction,
+    # color extraction and asset generation.
+    pdf_doc = _open_pdf(pdf_bytes)
+    try:
+        return _create_passes(pdf_bytes, filename, pdf_doc)
+    finally:
+        if pdf_doc is not None:
+            pdf_doc.close()
+
+
+# Keep per-pass scratch files in RAM where a tmpfs is available (Linux)
+_TMP_ROOT = "/dev/shm" if os.path.isdir("/dev/shm") and os.access("/dev/shm", os.W_OK) else None
+
+# Document types whose event-type default colors are preferred over PDF colors
+_DEFAULT_COLOR_TYPES = frozenset({"boarding_pass", "transit"})
+
+
+def _create_passes(
+    pdf_bytes: bytes,
+    filename: str,
+    pdf_doc: Any,
+) -> Tuple[List[bytes], List[Dict[str, Any]], List[Dict[str, Any]], List[str]]:
     all_warnings: List[str] = []
 
     # ------------------------------------------------------------------
     # Step 1: Extract PDF text
     # ------------------------------------------------------------------
-    analysis = analyze_pdf(pdf_bytes, filename)
+    analysis = analyze_pdf(pdf_bytes, filename, pdf_doc)
     print(f"📝 [v2] PDF: {analysis.page_count} page(s), {len(analysis.text)} chars")
 
     # ------------------------------------------------------------------
@@ -69,7 +99,15 @@ def create_passes_v2(
     # ------------------------------------------------------------------
     # Step 4: Extract colors
     # ------------------------------------------------------------------
-    bg_color, fg_color, label_color = extract_colors(pdf_bytes, extraction.document_type)
+    # Confidently classified travel documents use the branded default palette,
+    # so rasterizing the PDF for a dominant color would be wasted work.
+    use_pdf_colors = not (
+        extraction.confidence >= 80
+        and extraction.document_type in _DEFAULT_COLOR_TYPES
+    )
+    bg_color, fg_color, label_color = extract_colors(
+        pdf_bytes, extraction.document_type, use_pdf_colors=use_pdf_colors, pdf_doc=pdf_doc
+    )
 
     # ------------------------------------------------------------------
     # Step 5: Consolidate barcodes and determine ticket count
@@ -80,10 +118,7 @@ def create_passes_v2(
     signer = get_signer()
     pass_type_id, team_id = signer.get_identifiers()
 
-    pkpass_files: List[bytes] = []
-    ticket_info: List[Dict[str, Any]] = []
-
-    for i in range(total_tickets):
+    def _build_ticket(i: int) -> Tuple[List[ExtractedBarcode], PassJSON, bool, List[str], bytes]:
         # Select the barcode for this ticket slot (empty list → barcode-less pass)
         ticket_barcodes = [barcodes[i]] if i < len(barcodes) else []
 
@@ -102,6 +137,38 @@ def create_passes_v2(
 
         # Validate before signing
         is_valid, validation_errors = validate_pass(pass_json)
+
+        # Sign and package
+        pkpass_data = _package_pass(pass_json, assets_dir, signer)
+        return ticket_barcodes, pass_json, is_valid, validation_errors, pkpass_data
+
+    with tempfile.TemporaryDirectory(dir=_TMP_ROOT) as assets_dir:
+        # Icon / thumbnail assets are identical for every ticket from this
+        # PDF, so render them once and copy them into each pass.
+        generate_assets(
+            pass_dir=assets_dir,
+            pdf_bytes=pdf_bytes,
+            document_type=extraction.document_type,
+            title=extraction.title,
+            bg_color=bg_color,
+            fg_color=fg_color,
+            pdf_doc=pdf_doc,
+        )
+
+        # Signing releases the GIL, so multi-ticket PDFs are built on a
+        # small thread pool.
+        if total_tickets == 1:
+            built = [_build_ticket(0)]
+        else:
+            workers = min(os.cpu_count() or 1, total_tickets, 4)
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                futures = [pool.submit(_build_ticket, i) for i in range(total_tickets)]
+                built = [f.result() for f in futures]
+
+    pkpass_files: List[bytes] = []
+    ticket_info: List[Dict[str, Any]] = []
+
+    for i, (ticket_barcodes, pass_json, is_valid, validation_errors, pkpass_data) in enumerate(built):
         if not is_valid:
             print(f"⚠️ [v2] Validation issues for ticket {i + 1}: {validation_errors}")
             for err in validation_errors:
@@ -111,8 +178,6 @@ def create_passes_v2(
         else:
             print(f"✅ [v2] Pass validation passed for ticket {i + 1}")
 
-        # Sign and package
-        pkpass_data = _package_pass(pass_json, pdf_bytes, extraction, bg_color, fg_color)
         pkpass_files.append(pkpass_data)
 
         # Build ticket_info entry for backwards-compat API response
@@ -223,46 +288,60 @@ def _consolidate_barcodes(
 
 
 # ---------------------------------------------------------------------------
-# Internal packaging helper
+# Internal packaging helpers
 # ---------------------------------------------------------------------------
 
+def _open_pdf(pdf_bytes: bytes) -> Any:
+    """Open *pdf_bytes* with PyMuPDF, or return None if that is not possible."""
+    try:
+        import fitz  # type: ignore
+
+        return fitz.open(stream=pdf_bytes, filetype="pdf")
+    except Exception as exc:
+        print(f"⚠️ [v2] PyMuPDF could not open PDF: {exc}")
+        return None
+
+
 def _package_pass(
     pass_json: PassJSON,
-    pdf_bytes: bytes,
-    extraction: PDFExtraction,
-    bg_color: str,
-    fg_color: str,
+    assets_dir: str,
+    signer: PassSigner,
 ) -> bytes:
-    signer = get_signer()
+    with tempfile.TemporaryDirectory(dir=_TMP_ROOT) as tmp:
+        # model_dump already converts nested Pydantic models to plain dicts
+        pass_data = pass_json.model_dump(exclude_none=True)
+
+        pass_bytes = _dump_pass_json(pass_data)
+        with open(os.path.join(tmp, "pass.json"), "wb") as f:
+            f.write(pass_bytes)
+
+        # Pre-rendered icon / thumbnail assets
+        for name in os.listdir(assets_dir):
+            src = os.path.join(assets_dir, name)
+            dst = os.path.join(tmp, name)
+            try:
+                os.link(src, dst)
+            except OSError:
+                shutil.copyfile(src, dst)
 
-    with tempfile.TemporaryDirectory() as tmp:
-        # Serialize PassJSON to dict, converting nested Pydantic models to plain dicts
-        pass_data = _serialize(pass_json.model_dump(exclude_none=True))
+        return signer.package_pass(tmp)
 
-        with open(os.path.join(tmp, "pass.json"), "w", encoding="utf-8") as f:
-            json.dump(pass_data, f, indent=2, ensure_ascii=False)
 
-        # Generate icon / thumbnail assets
-        generate_assets(
-            pass_dir=tmp,
-            pdf_bytes=pdf_bytes,
-            document_type=extraction.document_type,
-            title=extraction.title,
-            bg_color=bg_color,
-            fg_color=fg_color,
-        )
+def _dump_pass_json(pass_data: Dict[str, Any]) -> bytes:
+    """Serialize pass.json compactly; Wallet ignores whitespace.
 
-        return signer.package_pass(tmp)
+    Uses orjson (UTF-8 output) when installed, otherwise stdlib json with
+    ASCII escapes.
+    """
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(pass_data, default=_json_default)
+    return json.dumps(
+        pass_data, separators=(",", ":"), ensure_ascii=True, default=_json_default
+    ).encode("ascii")
 
 
-def _serialize(obj: Any) -> Any:
-    """Recursively convert Pydantic models and bytes to JSON-safe types."""
-    if hasattr(obj, "model_dump"):
-        return _serialize(obj.model_dump(exclude_none=True))
-    if isinstance(obj, dict):
-        return {k: _serialize(v) for k, v in obj.items() if v is not None}
-    if isinstance(obj, list):
-        return [_serialize(item) for item in obj]
+def _json_default(obj: Any) -> Any:
+    """json.dump hook for values model_dump leaves as non-JSON types."""
     if isinstance(obj, bytes):
         return obj.decode("latin-1")  # preserve byte values
-    return obj
+    return str(obj)
@@ -7,10 +7,15 @@ PassJSON that can then be validated and signed.
 from __future__ import annotations
 
 import os
-import uuid
+import secrets
 from datetime import datetime, timedelta, timezone
 from typing import List, Optional, Tuple
 
+try:
+    from dateutil import parser as dp  # type: ignore
+except ImportError:  # not installed on the Vercel build
+    dp = None
+
 from app.services.v2.models import (
     ExtractedBarcode,
     PKBarcode,
@@ -45,7 +50,7 @@ def build_pass(
     if total_tickets > 1:
         description = f"{description} — Ticket {ticket_index + 1} of {total_tickets}"
 
-    serial = str(uuid.uuid4())[:16]
+    serial = secrets.token_hex(8)
     organization = extraction.organization or "Add2Wallet"
 
     # Choose pass style
@@ -174,9 +179,7 @@ def _build_description(extraction: PDFExtraction) -> str:
 def _compute_expiry(extraction: PDFExtraction) -> str:
     """Expire next day at 03:00 if a date is known, otherwise 90 days from now."""
     try:
-        if extraction.date:
-            from dateutil import parser as dp  # type: ignore
-
+        if extraction.date and dp is not None:
             combined = f"{extraction.date} {extraction.time}" if extraction.time else extraction.date
             dt = dp.parse(combined, fuzzy=True, dayfirst=False)
             expire = dt.replace(hour=3, minute=0, second=0, microsecond=0)
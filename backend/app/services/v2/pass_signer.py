@@ -8,8 +8,10 @@ import io
 import json
 import os
 import tempfile
+import threading
 import zipfile
-from typing import Dict, Optional, Tuple
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
 
 from cryptography import x509
 from cryptography.hazmat.primitives import hashes, serialization
@@ -24,7 +26,13 @@ class PassSigner:
         self.certificates_path = certificates_path or os.path.join(
             os.path.dirname(__file__), "../../../certificates"
         )
+        # WWDR certificate file picked by _check_certificates_available
+        self._wwdr_path: Optional[str] = None
         self.signing_enabled = self._check_certificates_available()
+        self._identifiers: Optional[Tuple[str, str]] = None
+        # Parsed (pass_cert, private_key, wwdr_cert), loaded on first use
+        self._certs: Optional[Tuple[x509.Certificate, object, x509.Certificate]] = None
+        self._certs_lock = threading.Lock()
 
     # ------------------------------------------------------------------
     # Public helpers
@@ -32,6 +40,11 @@ class PassSigner:
 
     def get_identifiers(self) -> Tuple[str, str]:
         """Return (passTypeIdentifier, teamIdentifier) from the certificate."""
+        if self._identifiers is None:
+            self._identifiers = self._read_identifiers()
+        return self._identifiers
+
+    def _read_identifiers(self) -> Tuple[str, str]:
         if not self.signing_enabled:
             return "pass.com.andresboedo.add2wallet", "H9DPH4DQG7"
 
@@ -62,29 +75,14 @@ class PassSigner:
 
         return "pass.com.andresboedo.add2wallet", "H9DPH4DQG7"
 
-    def create_manifest(self, pass_dir: str) -> Dict[str, str]:
-        """Return SHA-1 manifest dict for all files in pass_dir."""
-        manifest: Dict[str, str] = {}
-        for filename in sorted(os.listdir(pass_dir)):
-            if filename.startswith(".") or filename == "manifest.json":
-                continue
-            file_path = os.path.join(pass_dir, filename)
-            if os.path.isfile(file_path):
-                with open(file_path, "rb") as f:
-                    manifest[filename] = hashlib.sha1(f.read()).hexdigest()
-        return manifest
-
-    def sign_manifest(self, manifest_path: str) -> bytes:
-        """Sign manifest.json and return DER-encoded detached CMS signature."""
+    def sign_manifest_bytes(self, manifest_data: bytes) -> bytes:
+        """Sign serialized manifest bytes and return a detached CMS signature."""
         if not self.signing_enabled:
             return b""
 
         try:
             pass_cert, private_key, wwdr_cert = self._load_all_certs()
 
-            with open(manifest_path, "rb") as f:
-                manifest_data = f.read()
-
             digest_name = os.getenv("PASS_SIGNATURE_DIGEST", "sha256").lower()
             digest_algo = hashes.SHA1() if "sha1" in digest_name else hashes.SHA256()
 
@@ -104,37 +102,31 @@ class PassSigner:
             print(f"❌ Signing failed: {exc}")
             return b""
 
-    def build_pkpass(self, pass_dir: str) -> bytes:
-        """Zip pass_dir contents into a .pkpass bytes blob."""
+    def package_pass(self, pass_dir: str) -> bytes:
+        """Create manifest, sign, and zip the pass directory into .pkpass bytes.
+
+        Each asset is read once: the same bytes are hashed for the manifest
+        and written to the zip. manifest.json and the signature are built in
+        memory and never written to pass_dir.
+        """
+        manifest: Dict[str, str] = {}
         buf = io.BytesIO()
-        with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as zf:
-            for filename in os.listdir(pass_dir):
-                if not filename.startswith("."):
-                    file_path = os.path.join(pass_dir, filename)
-                    if os.path.isfile(file_path):
-                        zf.write(file_path, filename)
-        buf.seek(0)
-        return buf.read()
+        with _open_zip(buf) as zf:
+            for entry in _pass_files(pass_dir, ("manifest.json", "signature")):
+                manifest[entry.name] = _zip_and_hash(zf, entry.path, entry.name)
 
-    def package_pass(self, pass_dir: str) -> bytes:
-        """Create manifest, sign, and zip the pass directory into .pkpass bytes."""
-        # Write manifest.json
-        manifest = self.create_manifest(pass_dir)
-        manifest_path = os.path.join(pass_dir, "manifest.json")
-        with open(manifest_path, "w") as f:
-            json.dump(manifest, f, indent=2)
-
-        # Sign manifest if certs are available
-        if self.signing_enabled:
-            sig = self.sign_manifest(manifest_path)
-            if sig:
-                sig_path = os.path.join(pass_dir, "signature")
-                with open(sig_path, "wb") as f:
-                    f.write(sig)
-            else:
-                print("⚠️ Signing produced empty bytes — pass will be unsigned")
-
-        return self.build_pkpass(pass_dir)
+            manifest_data = json.dumps(manifest, separators=(",", ":")).encode("utf-8")
+            _writestr(zf, "manifest.json", manifest_data)
+
+            # Sign manifest if certs are available
+            if self.signing_enabled:
+                sig = self.sign_manifest_bytes(manifest_data)
+                if sig:
+                    _writestr(zf, "signature", sig)
+                else:
+                    print("⚠️ Signing produced empty bytes — pass will be unsigned")
+
+        return buf.getvalue()
 
     # ------------------------------------------------------------------
     # Private helpers
@@ -159,7 +151,11 @@ class PassSigner:
 
         wwdr_g4 = os.path.join(self.certificates_path, "wwdrg4.pem")
         wwdr = os.path.join(self.certificates_path, "wwdr.pem")
-        if not os.path.exists(wwdr_g4) and not os.path.exists(wwdr):
+        if os.path.exists(wwdr_g4):
+            self._wwdr_path = wwdr_g4
+        elif os.path.exists(wwdr):
+            self._wwdr_path = wwdr
+        else:
             print("⚠️ No WWDR certificate found (need wwdrg4.pem or wwdr.pem)")
             return False
 
@@ -167,25 +163,25 @@ class PassSigner:
         return True
 
     def _load_pass_cert(self) -> x509.Certificate:
-        if os.getenv("PASS_CERT_PEM"):
-            data = base64.b64decode(os.getenv("PASS_CERT_PEM"))  # type: ignore[arg-type]
-            return x509.load_pem_x509_certificate(data)
-        path = os.path.join(self.certificates_path, "pass.pem")
-        with open(path, "rb") as f:
-            return x509.load_pem_x509_certificate(f.read())
+        return self._load_all_certs()[0]
 
     def _load_all_certs(self) -> Tuple[x509.Certificate, object, x509.Certificate]:
-        """Return (pass_cert, private_key, wwdr_cert)."""
-        if os.getenv("PASS_CERT_PEM"):
-            pass_cert = x509.load_pem_x509_certificate(
-                base64.b64decode(os.getenv("PASS_CERT_PEM"))  # type: ignore[arg-type]
-            )
-            private_key = serialization.load_pem_private_key(
-                base64.b64decode(os.getenv("PASS_KEY_PEM")), password=None  # type: ignore[arg-type]
-            )
-            wwdr_cert = x509.load_pem_x509_certificate(
-                base64.b64decode(os.getenv("WWDR_CERT_PEM"))  # type: ignore[arg-type]
-            )
+        """Return (pass_cert, private_key, wwdr_cert), parsing them only once."""
+        if self._certs is None:
+            with self._certs_lock:
+                if self._certs is None:
+                    self._certs = self._read_all_certs()
+        return self._certs
+
+    def _read_all_certs(self) -> Tuple[x509.Certificate, object, x509.Certificate]:
+        """Read and parse (pass_cert, private_key, wwdr_cert) from env or disk."""
+        cert_pem = os.getenv("PASS_CERT_PEM")
+        if cert_pem:
+            key_pem = os.getenv("PASS_KEY_PEM", "")
+            wwdr_pem = os.getenv("WWDR_CERT_PEM", "")
+            pass_cert = _load_pem(base64.b64decode(cert_pem), x509.load_pem_x509_certificate)
+            private_key = _load_pem(base64.b64decode(key_pem), _load_private_key)
+            wwdr_cert = _load_pem(base64.b64decode(wwdr_pem), x509.load_pem_x509_certificate)
             print("🔗 Using certificates from environment variables")
             return pass_cert, private_key, wwdr_cert
 
@@ -193,22 +189,121 @@ class PassSigner:
         key_path = os.path.join(self.certificates_path, "key.pem")
 
         with open(cert_path, "rb") as f:
-            pass_cert = x509.load_pem_x509_certificate(f.read())
+            pass_cert = _load_pem(f.read(), x509.load_pem_x509_certificate)
         with open(key_path, "rb") as f:
-            private_key = serialization.load_pem_private_key(f.read(), password=None)
-
-        wwdr_g4 = os.path.join(self.certificates_path, "wwdrg4.pem")
-        wwdr = os.path.join(self.certificates_path, "wwdr.pem")
-        wwdr_path = wwdr_g4 if os.path.exists(wwdr_g4) else wwdr
+            private_key = _load_pem(f.read(), _load_private_key)
 
+        wwdr_path = self._wwdr_path or os.path.join(self.certificates_path, "wwdr.pem")
         with open(wwdr_path, "rb") as f:
-            wwdr_cert = x509.load_pem_x509_certificate(f.read())
+            wwdr_cert = _load_pem(f.read(), x509.load_pem_x509_certificate)
 
-        label = "G4" if os.path.exists(wwdr_g4) else "default"
+        label = "G4" if os.path.basename(wwdr_path) == "wwdrg4.pem" else "default"
         print(f"🔗 Using WWDR {label} certificate for signing")
         return pass_cert, private_key, wwdr_cert
 
 
+# Parsed certificates / keys shared by every PassSigner in the process, keyed
+# by the SHA-256 of the PEM so recreated signers don't parse them again.
+_PEM_CACHE_MAXSIZE = 16
+_pem_cache: "OrderedDict[bytes, Any]" = OrderedDict()
+_pem_cache_lock = threading.Lock()
+
+
+def _load_private_key(pem: bytes) -> Any:
+    return serialization.load_pem_private_key(pem, password=None)
+
+
+def _load_pem(pem: bytes, loader: Callable[[bytes], Any]) -> Any:
+    """Parse *pem* with *loader*, reusing an earlier parse of identical bytes."""
+    key = hashlib.sha256(pem).digest()
+    with _pem_cache_lock:
+        cached = _pem_cache.get(key)
+        if cached is not None:
+            _pem_cache.move_to_end(key)
+            return cached
+
+    parsed = loader(pem)
+    with _pem_cache_lock:
+        _pem_cache[key] = parsed
+        if len(_pem_cache) > _PEM_CACHE_MAXSIZE:
+            _pem_cache.popitem(last=False)
+    return parsed
+
+
+def _pass_files(pass_dir: str, exclude: Iterable[str] = ()) -> List[os.DirEntry]:
+    """Regular, non-hidden files in pass_dir sorted by name, minus *exclude*.
+
+    os.scandir gets the file type from the directory listing, so no extra
+    stat is needed per entry on Linux.
+    """
+    with os.scandir(pass_dir) as it:
+        entries = [
+            e for e in it
+            if not e.name.startswith(".") and e.name not in exclude and e.is_file()
+        ]
+    entries.sort(key=lambda e: e.name)
+    return entries
+
+
+def _new_sha1():
+    # OpenSSL-backed SHA-1 (uses SHA-NI / ARMv8 SHA extensions where the CPU
+    # has them); usedforsecurity=False skips the FIPS-mode wrapper. Apple
+    # mandates SHA-1 for manifest entries.
+    return hashlib.new("sha1", usedforsecurity=False)
+
+
+# Assets larger than this are streamed into the zip instead of read whole
+_STREAM_THRESHOLD = 512 * 1024
+
+# pass.json and manifest.json are tiny, so a mid compression level costs
+# next to nothing; PNGs are already deflated and are stored as-is.
+_ZIP_COMPRESSLEVEL = 6
+_STORED_SUFFIXES = (".png",)
+
+
+def _open_zip(buf: io.BytesIO) -> zipfile.ZipFile:
+    return zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED, compresslevel=_ZIP_COMPRESSLEVEL)
+
+
+def _compress_type(arcname: str) -> int:
+    """ZIP_STORED for already-compressed assets, ZIP_DEFLATED otherwise."""
+    if arcname.lower().endswith(_STORED_SUFFIXES):
+        return zipfile.ZIP_STORED
+    return zipfile.ZIP_DEFLATED
+
+
+# Fixed entry timestamp: identical pass contents give byte-identical .pkpass
+# files, and no clock or stat lookups are needed per entry.
+_ZIP_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+
+
+def _zip_info(arcname: str) -> zipfile.ZipInfo:
+    zinfo = zipfile.ZipInfo(arcname, date_time=_ZIP_DATE_TIME)
+    zinfo.compress_type = _compress_type(arcname)
+    zinfo.external_attr = 0o644 << 16  # -rw-r--r--
+    return zinfo
+
+
+def _writestr(zf: zipfile.ZipFile, arcname: str, data: bytes) -> None:
+    zf.writestr(_zip_info(arcname), data, compresslevel=_ZIP_COMPRESSLEVEL)
+
+
+def _zip_and_hash(zf: zipfile.ZipFile, path: str, arcname: str) -> str:
+    """Add *path* to *zf* as *arcname* and return its SHA-1 hex digest."""
+    h = _new_sha1()
+    if os.path.getsize(path) <= _STREAM_THRESHOLD:
+        with open(path, "rb") as f:
+            data = f.read()
+        h.update(data)
+        _writestr(zf, arcname, data)
+    else:
+        with open(path, "rb") as src, zf.open(_zip_info(arcname), "w") as dst:
+            for chunk in iter(lambda: src.read(1 << 16), b""):
+                h.update(chunk)
+                dst.write(chunk)
+    return h.hexdigest()
+
+
 # Global instance — lazily created so import doesn't fail if certs are missing
 _signer: Optional[PassSigner] = None
 
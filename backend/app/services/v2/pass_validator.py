@@ -3,20 +3,29 @@
 from __future__ import annotations
 
 import re
+from collections import Counter
+from datetime import datetime
 from typing import List, Tuple, Optional
 
 from app.services.v2.models import PassJSON, PassField, PassStructure
 
-_RGB_PATTERN = re.compile(r"^rgb\(\s*(\d{1,3})\s*,\s*(\d{1,3})\s*,\s*(\d{1,3})\s*\)$")
 _ISO8601_PATTERN = re.compile(
-    r"^\d{4}-\d{2}-\d{2}(T\d{2}:\d{2}(:\d{2})?(\.\d+)?(Z|[+-]\d{2}:\d{2})?)?$"
+    r"\d{4}-\d{2}-\d{2}(T\d{2}:\d{2}(:\d{2})?(\.\d+)?(Z|[+-]\d{2}:\d{2})?)?"
 )
-_VALID_BARCODE_FORMATS = {
+_VALID_BARCODE_FORMATS = frozenset({
     "PKBarcodeFormatQR",
     "PKBarcodeFormatPDF417",
     "PKBarcodeFormatAztec",
     "PKBarcodeFormatCode128",
-}
+})
+_VALID_TRANSIT_TYPES = frozenset({
+    "PKTransitTypeAir",
+    "PKTransitTypeBoat",
+    "PKTransitTypeBus",
+    "PKTransitTypeGeneric",
+    "PKTransitTypeTrain",
+})
+_STYLE_NAMES = ("eventTicket", "generic", "boardingPass", "coupon", "storeCard")
 
 
 def validate_pass(pass_json: PassJSON) -> Tuple[bool, List[str]]:
@@ -38,14 +47,8 @@ def validate_pass(pass_json: PassJSON) -> Tuple[bool, List[str]]:
         errors.append(f"formatVersion must be 1, got {pass_json.formatVersion}")
 
     # --- Exactly one pass style ---
-    style_fields = {
-        "eventTicket": pass_json.eventTicket,
-        "generic": pass_json.generic,
-        "boardingPass": pass_json.boardingPass,
-        "coupon": pass_json.coupon,
-        "storeCard": pass_json.storeCard,
-    }
-    set_styles = [k for k, v in style_fields.items() if v is not None]
+    style_fields = [(name, getattr(pass_json, name)) for name in _STYLE_NAMES]
+    set_styles = [k for k, v in style_fields if v is not None]
     if len(set_styles) != 1:
         errors.append(
             f"Exactly one pass style must be set; found {len(set_styles)}: {set_styles}"
@@ -53,10 +56,9 @@ def validate_pass(pass_json: PassJSON) -> Tuple[bool, List[str]]:
 
     # --- boardingPass requires transitType ---
     if pass_json.boardingPass is not None:
-        valid_transit = {"PKTransitTypeAir", "PKTransitTypeBoat", "PKTransitTypeBus", "PKTransitTypeGeneric", "PKTransitTypeTrain"}
         if not pass_json.boardingPass.transitType:
             errors.append("boardingPass requires transitType")
-        elif pass_json.boardingPass.transitType not in valid_transit:
+        elif pass_json.boardingPass.transitType not in _VALID_TRANSIT_TYPES:
             errors.append(f"boardingPass.transitType '{pass_json.boardingPass.transitType}' is not valid")
 
     # --- Color values ---
@@ -80,7 +82,7 @@ def validate_pass(pass_json: PassJSON) -> Tuple[bool, List[str]]:
                 errors.append(f"barcodes[{i}].message must not be empty")
 
     # --- Field key uniqueness per array ---
-    for style_name, structure in style_fields.items():
+    for style_name, structure in style_fields:
         if structure is None:
             continue
         _check_unique_keys(style_name, "headerFields", structure.headerFields, errors)
@@ -104,17 +106,33 @@ def _require_nonempty(condition: bool, message: str, errors: List[str]) -> None:
 
 
 def _valid_rgb(value: str) -> bool:
-    match = _RGB_PATTERN.match(value)
-    if not match:
+    """True for "rgb(r, g, b)" with 0-255 channels (whitespace around numbers allowed)."""
+    if not (value.startswith("rgb(") and value.endswith(")")):
         return False
-    for i in range(1, 4):
-        if int(match.group(i)) > 255:
+    parts = value[4:-1].split(",")
+    if len(parts) != 3:
+        return False
+    for part in parts:
+        part = part.strip(" \t\n\r\f\v")
+        if not (0 < len(part) <= 3 and part.isascii() and part.isdigit()) or int(part) > 255:
             return False
     return True
 
 
 def _valid_iso8601(value: str) -> bool:
-    return bool(_ISO8601_PATTERN.match(value))
+    """True for W3C-style ISO 8601 dates (YYYY-MM-DD[THH:MM[:SS[.f]][Z|±HH:MM]]).
+
+    The pattern fixes the shape, since datetime.fromisoformat also accepts
+    basic, hour-only and ±HHMM forms Wallet does not; fromisoformat then
+    rejects impossible dates such as 2024-13-40.
+    """
+    if not _ISO8601_PATTERN.fullmatch(value):
+        return False
+    try:
+        datetime.fromisoformat(value[:-1] + "+00:00" if value.endswith("Z") else value)
+    except ValueError:
+        return False
+    return True
 
 
 def _check_unique_keys(
@@ -123,10 +141,11 @@ def _check_unique_keys(
     fields: List[PassField],
     errors: List[str],
 ) -> None:
-    seen: set = set()
-    for field in fields:
-        if field.key in seen:
+    keys = [field.key for field in fields]
+    if len(set(keys)) == len(keys):
+        return
+    for key, count in Counter(keys).items():
+        if count > 1:
             errors.append(
-                f"{style}.{field_name} has duplicate key '{field.key}'"
+                f"{style}.{field_name} has duplicate key '{key}'"
             )
-        seen.add(field.key)
@@ -4,7 +4,17 @@ from __future__ import annotations
 
 import io
 from dataclasses import dataclass, field
-from typing import List, Optional
+from typing import List, Optional, Tuple
+
+try:
+    import fitz  # type: ignore
+except ImportError:  # PyMuPDF is not installed on the Vercel build
+    fitz = None
+
+try:
+    import PyPDF2  # type: ignore
+except ImportError:
+    PyPDF2 = None
 
 
 @dataclass
@@ -20,14 +30,35 @@ class PDFAnalysis:
         self.text_for_ai = self.text[:4000].strip()
 
 
-def analyze_pdf(pdf_bytes: bytes, filename: str) -> PDFAnalysis:
+def analyze_pdf(
+    pdf_bytes: bytes,
+    filename: str,
+    pdf_doc: Optional["fitz.Document"] = None,
+) -> PDFAnalysis:
     """Extract text from a PDF and return a PDFAnalysis object.
 
     Tries PyMuPDF first (faster, better for PDFs with embedded fonts),
-    falls back to PyPDF2 if unavailable.
+    falls back to PyPDF2 if unavailable. An already-open *pdf_doc* is used
+    as-is and left open for the caller; otherwise the PDF is opened once
+    for both text and page count.
     """
-    text = _extract_with_fitz(pdf_bytes) or _extract_with_pypdf2(pdf_bytes)
-    page_count = _count_pages(pdf_bytes)
+    doc = pdf_doc if pdf_doc is not None else _open_fitz(pdf_bytes)
+    text: Optional[str] = None
+    page_count: Optional[int] = None
+    if doc is not None:
+        try:
+            page_count = doc.page_count
+            text = _extract_with_fitz(doc)
+        finally:
+            if doc is not pdf_doc:
+                doc.close()
+
+    if not text or page_count is None:
+        # One PdfReader serves both the fallback text and the page count
+        pypdf2_text, pypdf2_pages = _extract_with_pypdf2(pdf_bytes)
+        text = text or pypdf2_text
+        if page_count is None:
+            page_count = pypdf2_pages or 1
     return PDFAnalysis(text=text, page_count=page_count, filename=filename)
 
 
@@ -35,16 +66,21 @@ def analyze_pdf(pdf_bytes: bytes, filename: str) -> PDFAnalysis:
 # Internal helpers
 # ---------------------------------------------------------------------------
 
-def _extract_with_fitz(pdf_bytes: bytes) -> Optional[str]:
+def _open_fitz(pdf_bytes: bytes) -> Optional["fitz.Document"]:
+    if fitz is None:
+        return None
     try:
-        import fitz  # type: ignore
+        return fitz.open(stream=pdf_bytes, filetype="pdf")
+    except Exception as exc:
+        print(f"⚠️ PyMuPDF text extraction failed: {exc}")
+        return None
 
-        doc = fitz.open(stream=pdf_bytes, filetype="pdf")
-        parts: List[str] = []
-        for page in doc:
-            parts.append(page.get_text())
-        doc.close()
-        result = "\n".join(parts).strip()
+
+def _extract_with_fitz(doc: "fitz.Document") -> Optional[str]:
+    # Pages are read sequentially: a fitz.Document must not be used from
+    # several threads at once.
+    try:
+        result = "\n".join(page.get_text() for page in doc).strip()
         if result:
             print(f"📝 PyMuPDF extracted {len(result)} chars of PDF text")
         return result or None
@@ -53,35 +89,21 @@ def _extract_with_fitz(pdf_bytes: bytes) -> Optional[str]:
         return None
 
 
-def _extract_with_pypdf2(pdf_bytes: bytes) -> str:
+def _extract_with_pypdf2(pdf_bytes: bytes) -> Tuple[str, Optional[int]]:
+    """Return (text, page_count) from a single PdfReader; page_count is None on failure."""
+    if PyPDF2 is None:
+        print("⚠️ PyPDF2 text extraction failed: PyPDF2 is not installed")
+        return "", None
+    page_count: Optional[int] = None
     try:
-        import PyPDF2  # type: ignore
-
         reader = PyPDF2.PdfReader(io.BytesIO(pdf_bytes))
+        page_count = len(reader.pages)
         parts: List[str] = []
         for page in reader.pages:
             parts.append(page.extract_text() or "")
         result = "\n".join(parts).strip()
         print(f"📝 PyPDF2 extracted {len(result)} chars of PDF text")
-        return result
+        return result, page_count
     except Exception as exc:
         print(f"⚠️ PyPDF2 text extraction failed: {exc}")
-        return ""
-
-
-def _count_pages(pdf_bytes: bytes) -> int:
-    try:
-        import fitz  # type: ignore
-
-        doc = fitz.open(stream=pdf_bytes, filetype="pdf")
-        count = doc.page_count
-        doc.close()
-        return count
-    except Exception:
-        pass
-    try:
-        import PyPDF2  # type: ignore
-
-        return len(PyPDF2.PdfReader(io.BytesIO(pdf_bytes)).pages)
-    except Exception:
-        return 1
+        return "", page_count
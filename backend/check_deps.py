@@ -3,80 +3,44 @@
 Dependency checker for Railway deployment
 """
 
-def check_dependencies():
-    print("🔍 Checking dependencies...")
-    
+import importlib
+
+# (label, module, version attribute or None); imported one at a time so a
+# broken native library only affects its own line
+DEPENDENCIES = [
     # Basic imports
-    try:
-        import fastapi
-        print("✅ FastAPI:", fastapi.__version__)
-    except ImportError as e:
-        print("❌ FastAPI:", e)
-    
-    try:
-        import uvicorn
-        print("✅ Uvicorn available")
-    except ImportError as e:
-        print("❌ Uvicorn:", e)
-    
+    ("FastAPI", "fastapi", "__version__"),
+    ("Uvicorn", "uvicorn", None),
     # OpenAI
-    try:
-        import openai
-        print("✅ OpenAI:", openai.__version__)
-    except ImportError as e:
-        print("❌ OpenAI:", e)
-    
+    ("OpenAI", "openai", "__version__"),
     # PDF processing
-    try:
-        import PyPDF2
-        print("✅ PyPDF2 available")
-    except ImportError as e:
-        print("❌ PyPDF2:", e)
-    
-    try:
-        import fitz
-        print("✅ PyMuPDF available")
-    except ImportError as e:
-        print("❌ PyMuPDF:", e)
-    
+    ("PyPDF2", "PyPDF2", None),
+    ("PyMuPDF", "fitz", None),
     # Image processing
-    try:
-        from PIL import Image
-        print("✅ Pillow available")
-    except ImportError as e:
-        print("❌ Pillow:", e)
-    
+    ("Pillow", "PIL.Image", None),
     # Binary dependencies (the problematic ones)
-    try:
-        import cv2
-        print("✅ OpenCV:", cv2.__version__)
-    except ImportError as e:
-        print("❌ OpenCV:", e)
-    
-    try:
-        import numpy as np
-        print("✅ NumPy:", np.__version__)
-    except ImportError as e:
-        print("❌ NumPy:", e)
-    
-    try:
-        from pyzbar import pyzbar
-        print("✅ pyzbar available")
-    except ImportError as e:
-        print("❌ pyzbar:", e)
-    
-    try:
-        from pdf2image import convert_from_bytes
-        print("✅ pdf2image available")
-    except ImportError as e:
-        print("❌ pdf2image:", e)
-    
+    ("OpenCV", "cv2", "__version__"),
+    ("NumPy", "numpy", "__version__"),
+    ("pyzbar", "pyzbar.pyzbar", None),
+    ("pdf2image", "pdf2image", None),
     # Cryptography
-    try:
-        import cryptography
-        print("✅ Cryptography:", cryptography.__version__)
-    except ImportError as e:
-        print("❌ Cryptography:", e)
+    ("Cryptography", "cryptography", "__version__"),
+]
+
+
+def check_dependencies():
+    print("🔍 Checking dependencies...")
+
+    for label, module_name, version_attr in DEPENDENCIES:
+        try:
+            module = importlib.import_module(module_name)
+        except ImportError as e:
+            print(f"❌ {label}:", e)
+            continue
+        if version_attr:
+            print(f"✅ {label}:", getattr(module, version_attr, "unknown"))
+        else:
+            print(f"✅ {label} available")
 
 if __name__ == "__main__":
-    check_dependencies()
\ No newline at end of file
+    check_dependencies()
@@ -0,0 +1,111 @@
+import os
+import sys
+
+import pytest
+
+# Make `app` importable for the test scripts in this directory
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BACKEND_DIR)
+
+TEST_FILES_DIR = os.path.join(BACKEND_DIR, "test_files")
+
+# (filename, expected pass count); PDFs over ~500 KB take several seconds
+# to rasterize and are marked slow (skipped unless --runslow)
+PDF_CASES = [
+    pytest.param(("eTicket.pdf", 1), id="eTicket", marks=pytest.mark.slow),  # duplicate QR codes
+    pytest.param(("Louvre mobile.pdf", 2), id="Louvre"),  # different QR codes
+    pytest.param(("tickets_7587005.pdf", 1), id="tickets_7587005", marks=pytest.mark.slow),  # single barcode
+]
+
+
+def pytest_addoption(parser):
+    parser.addoption("--runslow", action="store_true", default=False, help="also run tests marked slow")
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "slow: large PDF case; only runs with --runslow")
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("--runslow"):
+        return
+    skip_slow = pytest.mark.skip(reason="slow; pass --runslow to run")
+    for item in items:
+        if "slow" in item.keywords:
+            item.add_marker(skip_slow)
+
+
+@pytest.fixture(scope="session")
+def pass_generator():
+    # The app's own singleton, so tests share whatever it has already set up
+    from app.services.pass_generator import pass_generator
+
+    return pass_generator
+
+
+@pytest.fixture(scope="session")
+def barcode_extractor():
+    """The extractor singleton, warmed up once per session."""
+    # Imported lazily: needs the native zbar library
+    module = pytest.importorskip("app.services.barcode_extractor", reason="barcode extraction needs native zbar")
+    import numpy as np
+
+    extractor = module.barcode_extractor
+    # A blank decode loads libzbar and initializes OpenCV before the first timed test
+    extractor.decode_with_formats(np.zeros((32, 32), np.uint8), extractor.format_groups[0])
+    return extractor
+
+
+@pytest.fixture
+def cached_rasterizer(monkeypatch):
+    """Make barcode_extractor rasterize PDFs through the shared test cache."""
+    from tests._pdf_cache import cached_convert_from_bytes
+
+    try:
+        import app.services.barcode_extractor as extractor_module
+    except ImportError:
+        # No native zbar: the tests report the import failure themselves
+        return cached_convert_from_bytes
+    monkeypatch.setattr(extractor_module, "convert_from_bytes", cached_convert_from_bytes)
+    return cached_convert_from_bytes
+
+
+@pytest.fixture(params=PDF_CASES)
+def pdf_case(request):
+    """One sample PDF as (pdf_bytes, filename, expected pass count)."""
+    # Expected counts depend on visual detection, which needs native zbar
+    pytest.importorskip("app.services.barcode_extractor", reason="barcode extraction needs native zbar")
+    from tests._pdf_cache import read_pdf
+
+    filename, expected = request.param
+    try:
+        pdf_data = read_pdf(os.path.join(TEST_FILES_DIR, filename))
+    except FileNotFoundError:
+        pytest.skip(f"test file not found: {filename}")
+    return pdf_data, filename, expected
+
+
+@pytest.fixture(scope="session")
+def data_matrix_pdf():
+    """Bytes of the sample ticket whose barcode is a Data Matrix code."""
+    from tests._pdf_cache import read_pdf
+
+    try:
+        return read_pdf(os.path.join(TEST_FILES_DIR, "pass_with_data_matrix.pdf"))
+    except FileNotFoundError:
+        pytest.skip("test file not found: pass_with_data_matrix.pdf")
+
+
+@pytest.fixture(scope="session")
+def data_matrix_barcodes(barcode_extractor, data_matrix_pdf):
+    """extract_barcodes_from_pdf result for the Data Matrix sample, computed once.
+
+    Tests only read the result; copy before modifying it.
+    """
+    import app.services.barcode_extractor as extractor_module
+    from tests._pdf_cache import cached_convert_from_bytes
+
+    # Session-scoped, so patch directly rather than through cached_rasterizer
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(extractor_module, "convert_from_bytes", cached_convert_from_bytes)
+        return barcode_extractor.extract_barcodes_from_pdf(data_matrix_pdf, "pass_with_data_matrix.pdf")
@@ -1,11 +1,11 @@
 #!/usr/bin/env python3
 """Server monitoring script that shows real-time logs and status."""
 
+import os
 import subprocess
 import sys
 import time
 import signal
-from datetime import datetime
 
 class ServerMonitor:
     def __init__(self):
@@ -22,18 +22,33 @@ class ServerMonitor:
                 [sys.executable, "run.py"],
                 stdout=subprocess.PIPE,
                 stderr=subprocess.STDOUT,
-                universal_newlines=True,
-                bufsize=1
+                bufsize=-1
             )
             
-            # Monitor the output in real-time
+            # Monitor the output in real-time: read whatever is available in
+            # large chunks and split lines ourselves instead of readline()
+            fd = self.server_process.stdout.fileno()
+            pending = b""
+            last_sec = None
+            timestamp = ""
             while True:
-                output = self.server_process.stdout.readline()
-                if output == '' and self.server_process.poll() is not None:
+                chunk = os.read(fd, 65536)
+                if not chunk:
                     break
-                if output:
-                    timestamp = datetime.now().strftime("%H:%M:%S")
-                    print(f"[{timestamp}] {output.strip()}")
+                lines = (pending + chunk).split(b"\n")
+                pending = lines.pop()
+                # Format the timestamp at most once per second
+                now_sec = int(time.time())
+                if now_sec != last_sec:
+                    timestamp = time.strftime("%H:%M:%S", time.localtime(now_sec))
+                    last_sec = now_sec
+                for line in lines:
+                    line = line.strip()
+                    if line:
+                        print(f"[{timestamp}] {line.decode('utf-8', errors='replace')}")
+            if pending.strip():
+                print(f"[{timestamp}] {pending.strip().decode('utf-8', errors='replace')}")
+            self.server_process.wait()
                     
         except KeyboardInterrupt:
             print("\n🛑 Shutting down server...")
@@ -3,9 +3,19 @@
 
 import sys
 import os
+from concurrent.futures import ProcessPoolExecutor
 sys.path.append('.')
 from app.services.barcode_extractor import barcode_extractor
 
+def _extract_file(file_path):
+    """Worker: extract barcodes from one PDF. Returns (barcodes, error message)."""
+    try:
+        with open(file_path, 'rb') as f:
+            pdf_data = f.read()
+        return barcode_extractor.extract_barcodes_from_pdf(pdf_data, os.path.basename(file_path)), None
+    except Exception as e:
+        return None, str(e)
+
 def test_all_files():
     """Test all PDF files in test_files directory."""
     
@@ -15,15 +25,18 @@ def test_all_files():
     
     print(f"Found {len(pdf_files)} PDF files to test\n")
     
-    for filename in pdf_files:
-        try:
+    # Extraction is CPU-bound, so spread the files over all cores; results
+    # come back in order and are printed as before.
+    file_paths = [os.path.join(test_dir, filename) for filename in pdf_files]
+    with ProcessPoolExecutor() as executor:
+        results = executor.map(_extract_file, file_paths, chunksize=1)
+        for filename, (barcodes, error) in zip(pdf_files, results):
             print(f'=== {filename} ===')
             
-            file_path = os.path.join(test_dir, filename)
-            with open(file_path, 'rb') as f:
-                pdf_data = f.read()
-
-            barcodes = barcode_extractor.extract_barcodes_from_pdf(pdf_data, filename)
+            if error is not None:
+                print(f'❌ Error processing {filename}: {error}')
+                print()
+                continue
 
             if barcodes:
                 print(f'✅ Found {len(barcodes)} unique barcode(s):')
@@ -45,10 +58,6 @@ def test_all_files():
                 print('❌ No barcodes detected')
                 
             print()
-                
-        except Exception as e:
-            print(f'❌ Error processing {filename}: {e}')
-            print()
     
     print("=== All files tested ===")
 
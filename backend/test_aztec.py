@@ -2,81 +2,95 @@
 """Test Aztec code generation and extraction."""
 
 import os
+import stat
 import sys
 import json
 import base64
 from pathlib import Path
 
-# Add parent directory to path
-sys.path.insert(0, str(Path(__file__).parent))
+import pytest
 
-from app.services.barcode_extractor import barcode_extractor
-from app.services.pass_generator import PassGenerator
+try:
+    import orjson
 
-def test_aztec_generation():
-    """Test generating a pass with an Aztec code."""
-    print("\n🧪 Testing Aztec Code Generation")
-    print("=" * 50)
-    
-    # Create a test pass configuration with Aztec code
-    pass_data = {
-        "formatVersion": 1,
-        "passTypeIdentifier": "pass.com.example.ticket",
-        "serialNumber": "AZTEC-TEST-001",
-        "teamIdentifier": "TESTTEAM",
-        "organizationName": "Aztec Test Org",
-        "description": "Test Aztec Code Pass",
-        "foregroundColor": "rgb(0, 0, 0)",
-        "backgroundColor": "rgb(255, 255, 255)",
-        "labelColor": "rgb(100, 100, 100)",
-        "boardingPass": {
-            "transitType": "PKTransitTypeTrain",
-            "primaryFields": [
-                {
-                    "key": "origin",
-                    "label": "FROM",
-                    "value": "Paris"
-                },
-                {
-                    "key": "destination", 
-                    "label": "TO",
-                    "value": "Lyon"
-                }
-            ],
-            "secondaryFields": [
-                {
-                    "key": "passenger",
-                    "label": "PASSENGER",
-                    "value": "John Doe"
-                }
-            ],
-            "auxiliaryFields": [
-                {
-                    "key": "seat",
-                    "label": "SEAT",
-                    "value": "4A"
-                },
-                {
-                    "key": "class",
-                    "label": "CLASS",
-                    "value": "First"
-                }
-            ],
-            "backFields": []
-        },
-        "barcode": {
+    def _dumps(obj):
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+
+    _loads = orjson.loads
+except ImportError:
+    def _dumps(obj):
+        return json.dumps(obj, indent=2).encode("utf-8")
+
+    _loads = json.loads
+
+# Test pass configuration with Aztec code, serialized once as the pass.json
+# file contents; _loads gives each caller its own copy.
+_PASS_BYTES = _dumps({
+    "formatVersion": 1,
+    "passTypeIdentifier": "pass.com.example.ticket",
+    "serialNumber": "AZTEC-TEST-001",
+    "teamIdentifier": "TESTTEAM",
+    "organizationName": "Aztec Test Org",
+    "description": "Test Aztec Code Pass",
+    "foregroundColor": "rgb(0, 0, 0)",
+    "backgroundColor": "rgb(255, 255, 255)",
+    "labelColor": "rgb(100, 100, 100)",
+    "boardingPass": {
+        "transitType": "PKTransitTypeTrain",
+        "primaryFields": [
+            {
+                "key": "origin",
+                "label": "FROM",
+                "value": "Paris"
+            },
+            {
+                "key": "destination", 
+                "label": "TO",
+                "value": "Lyon"
+            }
+        ],
+        "secondaryFields": [
+            {
+                "key": "passenger",
+                "label": "PASSENGER",
+                "value": "John Doe"
+            }
+        ],
+        "auxiliaryFields": [
+            {
+                "key": "seat",
+                "label": "SEAT",
+                "value": "4A"
+            },
+            {
+                "key": "class",
+                "label": "CLASS",
+                "value": "First"
+            }
+        ],
+        "backFields": []
+    },
+    "barcode": {
+        "message": "AZTEC-TICKET-12345-ABCDEF-TRAIN-PARIS-LYON",
+        "format": "PKBarcodeFormatAztec",
+        "messageEncoding": "iso-8859-1"
+    },
+    "barcodes": [
+        {
             "message": "AZTEC-TICKET-12345-ABCDEF-TRAIN-PARIS-LYON",
             "format": "PKBarcodeFormatAztec",
             "messageEncoding": "iso-8859-1"
-        },
-        "barcodes": [
-            {
-                "message": "AZTEC-TICKET-12345-ABCDEF-TRAIN-PARIS-LYON",
-                "format": "PKBarcodeFormatAztec",
-                "messageEncoding": "iso-8859-1"
-            }
-        ]
-    }
+        }
+    ]
+})
+
+def _generate_aztec_pass():
+    """Write the Aztec test pass.json and return its output directory."""
+    print("\n🧪 Testing Aztec Code Generation")
+    print("=" * 50)
+    
+    # Fresh mutable copy of the Aztec test pass configuration
+    pass_data = _loads(_PASS_BYTES)
     
     # Create output directory
     output_dir = Path("/tmp/aztec_test")
@@ -84,8 +98,11 @@ def test_aztec_generation():
     
     # Save pass.json
     pass_json_path = output_dir / "pass.json"
-    with open(pass_json_path, "w") as f:
-        json.dump(pass_data, f, indent=2)
+    fd = os.open(pass_json_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        os.write(fd, _PASS_BYTES)
+    finally:
+        os.close(fd)
     
     print(f"✅ Created pass.json with Aztec code configuration")
     print(f"   Format: {pass_data['barcode']['format']}")
@@ -93,7 +110,30 @@ def test_aztec_generation():
     
     return output_dir
 
-def test_aztec_extraction():
+def test_aztec_generation():
+    """Test generating a pass with an Aztec code."""
+    output_dir = _generate_aztec_pass()
+    with open(output_dir / "pass.json", "rb") as f:
+        assert _loads(f.read())["barcode"]["format"] == "PKBarcodeFormatAztec"
+
+def _first_pdf(paths):
+    """Return the first PDF among *paths*: a file itself, or a PDF inside a directory."""
+    for path in paths:
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            continue
+        if stat.S_ISDIR(st.st_mode):
+            # Check for PDFs in directory
+            with os.scandir(path) as it:
+                for entry in it:
+                    if entry.name.endswith(".pdf") and entry.is_file(follow_symlinks=False):
+                        return entry.path
+        elif stat.S_ISREG(st.st_mode):
+            return path
+    return None
+
+def test_aztec_extraction(barcode_extractor):
     """Test extracting Aztec codes from a PDF."""
     print("\n🧪 Testing Aztec Code Extraction")
     print("=" * 50)
@@ -104,25 +144,11 @@ def test_aztec_extraction():
         "/tmp/test_aztec.pdf"
     ]
     
-    pdf_found = False
-    for pdf_path in test_pdfs:
-        if os.path.exists(pdf_path):
-            if os.path.isdir(pdf_path):
-                # Check for PDFs in directory
-                pdf_files = list(Path(pdf_path).glob("*.pdf"))
-                if pdf_files:
-                    pdf_path = pdf_files[0]
-                    pdf_found = True
-                    break
-            else:
-                pdf_found = True
-                break
-    
-    if not pdf_found:
-        print("⚠️  No test PDF found. Creating a synthetic test...")
-        # For now, we'll just test the extraction logic
-        test_extraction_logic()
-        return
+    pdf_path = _first_pdf(test_pdfs)
+    
+    if pdf_path is None:
+        # test_extraction_logic covers the detection logic on its own
+        pytest.skip("no Aztec test PDF found")
     
     print(f"📄 Testing with PDF: {pdf_path}")
     
@@ -149,7 +175,7 @@ def test_aztec_extraction():
         if barcode.get('type') == 'AZTEC':
             print(f"   ✅ AZTEC CODE DETECTED!")
 
-def test_extraction_logic():
+def test_extraction_logic(barcode_extractor):
     """Test the Aztec detection logic without actual PDFs."""
     print("\n🧪 Testing Aztec Detection Logic")
     print("=" * 50)
@@ -176,29 +202,8 @@ def test_extraction_logic():
     for fmt in formats_to_test:
         normalized = barcode_extractor._normalize_barcode_format(fmt)
         print(f"   {fmt} -> {normalized}")
-
-def main():
-    """Run all Aztec code tests."""
-    print("🚀 Starting Aztec Code Compatibility Tests")
-    print("=" * 50)
-    
-    try:
-        # Test generation
-        output_dir = test_aztec_generation()
-        
-        # Test extraction
-        test_aztec_extraction()
-        
-        print("\n✅ All tests completed!")
-        print(f"   Generated test pass in: {output_dir}")
-        
-    except Exception as e:
-        print(f"\n❌ Test failed: {e}")
-        import traceback
-        traceback.print_exc()
-        return 1
-    
-    return 0
+        assert normalized.startswith("PKBarcodeFormat")
+    assert barcode_extractor._normalize_barcode_format('AZTEC') == 'PKBarcodeFormatAztec'
 
 if __name__ == "__main__":
-    sys.exit(main())
\ No newline at end of file
+    sys.exit(pytest.main([__file__, "-v", "-s"]))
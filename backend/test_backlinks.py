@@ -12,15 +12,14 @@ Usage:
     APP_STORE_ID=1234567890 python test_backlinks.py
 """
 
+import io
 import os
 import sys
 import json
-import tempfile
 import zipfile
+from functools import lru_cache
 from typing import Dict, Any
-
-# Add the app directory to the path so we can import our modules
-sys.path.append(os.path.join(os.path.dirname(__file__), 'app'))
+from unittest.mock import patch
 
 try:
     from app.services.pass_generator import PassGenerator
@@ -28,17 +27,33 @@ except ImportError:
     print("❌ Failed to import PassGenerator. Make sure you're running from the backend directory.")
     sys.exit(1)
 
+try:
+    from orjson import loads as _loads
+except ImportError:
+    _loads = json.loads
+
+
+def _read_pass_json(pkpass_data: bytes) -> Dict[str, Any]:
+    """Parse pass.json straight out of in-memory .pkpass bytes."""
+    with zipfile.ZipFile(io.BytesIO(pkpass_data)) as zf:
+        return _loads(zf.read('pass.json'))
+
 
+@lru_cache(maxsize=1)
+def _pg() -> PassGenerator:
+    """Shared PassGenerator; APP_STORE_ID is read per call, not at construction."""
+    return PassGenerator()
+
+
+@patch.dict(os.environ)
 def test_associated_store_identifiers():
     """Test the _get_associated_store_identifiers method."""
     print("🧪 Testing _get_associated_store_identifiers method...")
     
-    pg = PassGenerator()
+    pg = _pg()
     
-    # Test without APP_STORE_ID
-    old_app_store_id = os.environ.get('APP_STORE_ID')
-    if 'APP_STORE_ID' in os.environ:
-        del os.environ['APP_STORE_ID']
+    # Test without APP_STORE_ID (patch.dict restores the environment afterwards)
+    os.environ.pop('APP_STORE_ID', None)
     
     store_ids = pg._get_associated_store_identifiers()
     print(f"   Without APP_STORE_ID: {store_ids}")
@@ -56,23 +71,15 @@ def test_associated_store_identifiers():
     print(f"   With invalid APP_STORE_ID: {store_ids}")
     assert store_ids is None, "Should return None for invalid APP_STORE_ID"
     
-    # Restore original value
-    if old_app_store_id:
-        os.environ['APP_STORE_ID'] = old_app_store_id
-    elif 'APP_STORE_ID' in os.environ:
-        del os.environ['APP_STORE_ID']
-    
     print("   ✅ _get_associated_store_identifiers tests passed")
 
 
+@patch.dict(os.environ, {'APP_STORE_ID': '1234567890'})
 def test_basic_pass_with_backlinks():
     """Test creating a basic pass with backlinks."""
     print("🧪 Testing basic pass creation with backlinks...")
     
-    # Set a test App Store ID
-    os.environ['APP_STORE_ID'] = '1234567890'
-    
-    pg = PassGenerator()
+    pg = _pg()
     
     # Create a basic pass
     pass_data = pg.create_basic_pass(
@@ -85,13 +92,7 @@ def test_basic_pass_with_backlinks():
     assert len(pass_data) > 0, "Pass data should not be empty"
     
     # Extract and verify the pass.json contains associatedStoreIdentifiers
-    with tempfile.NamedTemporaryFile(suffix='.pkpass') as temp_file:
-        temp_file.write(pass_data)
-        temp_file.flush()
-        
-        with zipfile.ZipFile(temp_file.name, 'r') as zf:
-            with zf.open('pass.json') as pass_file:
-                pass_json = json.loads(pass_file.read().decode('utf-8'))
+    pass_json = _read_pass_json(pass_data)
     
     print(f"   Pass JSON keys: {list(pass_json.keys())}")
     assert 'associatedStoreIdentifiers' in pass_json, "Pass should contain associatedStoreIdentifiers"
@@ -100,14 +101,12 @@ def test_basic_pass_with_backlinks():
     print("   ✅ Basic pass with backlinks test passed")
 
 
+@patch.dict(os.environ, {'APP_STORE_ID': '987654321'})
 def test_enhanced_pass_with_backlinks():
     """Test creating an enhanced pass with backlinks."""
     print("🧪 Testing enhanced pass creation with backlinks...")
     
-    # Set a test App Store ID
-    os.environ['APP_STORE_ID'] = '987654321'
-    
-    pg = PassGenerator()
+    pg = _pg()
     
     # Create sample pass info
     pass_info = {
@@ -133,13 +132,7 @@ def test_enhanced_pass_with_backlinks():
     assert len(pass_data) > 0, "Pass data should not be empty"
     
     # Extract and verify the pass.json contains associatedStoreIdentifiers
-    with tempfile.NamedTemporaryFile(suffix='.pkpass') as temp_file:
-        temp_file.write(pass_data)
-        temp_file.flush()
-        
-        with zipfile.ZipFile(temp_file.name, 'r') as zf:
-            with zf.open('pass.json') as pass_file:
-                pass_json = json.loads(pass_file.read().decode('utf-8'))
+    pass_json = _read_pass_json(pass_data)
     
     print(f"   Pass JSON keys: {list(pass_json.keys())}")
     assert 'associatedStoreIdentifiers' in pass_json, "Enhanced pass should contain associatedStoreIdentifiers"
@@ -148,34 +141,23 @@ def test_enhanced_pass_with_backlinks():
     print("   ✅ Enhanced pass with backlinks test passed")
 
 
+@patch.dict(os.environ)
 def test_pass_without_backlinks():
     """Test creating a pass without backlinks when APP_STORE_ID is not set."""
     print("🧪 Testing pass creation without backlinks...")
     
-    # Remove APP_STORE_ID
-    if 'APP_STORE_ID' in os.environ:
-        del os.environ['APP_STORE_ID']
+    # Remove APP_STORE_ID (restored by patch.dict afterwards)
+    os.environ.pop('APP_STORE_ID', None)
     
-    pg = PassGenerator()
+    pg = _pg()
     
-    # Create a basic pass
-    pass_data = pg.create_basic_pass(
+    # Only pass.json matters here, so skip signing and zipping;
+    # test_basic_pass_with_backlinks covers the full .pkpass build.
+    pass_json = pg._build_basic_pass_json(
         title='Test Pass without Backlinks',
         description='Testing pass without associatedStoreIdentifiers'
     )
     
-    print(f"   Created pass with {len(pass_data)} bytes")
-    assert len(pass_data) > 0, "Pass data should not be empty"
-    
-    # Extract and verify the pass.json does NOT contain associatedStoreIdentifiers
-    with tempfile.NamedTemporaryFile(suffix='.pkpass') as temp_file:
-        temp_file.write(pass_data)
-        temp_file.flush()
-        
-        with zipfile.ZipFile(temp_file.name, 'r') as zf:
-            with zf.open('pass.json') as pass_file:
-                pass_json = json.loads(pass_file.read().decode('utf-8'))
-    
     print(f"   Pass JSON keys: {list(pass_json.keys())}")
     assert 'associatedStoreIdentifiers' not in pass_json, "Pass should NOT contain associatedStoreIdentifiers when APP_STORE_ID is not set"
     
@@ -1,9 +1,21 @@
 #!/usr/bin/env python3
 """Test script to verify barcode deduplication works correctly."""
 
-import sys
-sys.path.append('.')
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from app.services.barcode_extractor import barcode_extractor
+from tests._pdf_cache import read_pdf
+
+
+def _process_one(filename):
+    """Worker: extract barcodes from one PDF. Returns (barcodes, error message)."""
+    try:
+        pdf_data = read_pdf(filename)
+        return barcode_extractor.extract_barcodes_from_pdf(pdf_data, filename), None
+    except FileNotFoundError:
+        return None, f'File not found: {filename}'
+    except Exception as e:
+        return None, f'Error processing {filename}: {e}'
 
 def test_barcode_deduplication():
     """Test barcode extraction and deduplication with multiple files."""
@@ -16,14 +28,19 @@ def test_barcode_deduplication():
         'test_files/Louvre mobile.pdf'
     ]
     
-    for filename in test_files:
-        try:
+    # Each PDF decodes independently, so extract them in parallel and report
+    # each one as soon as it finishes.
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+        futures = {executor.submit(_process_one, fn): fn for fn in test_files}
+        for future in as_completed(futures):
+            filename = futures[future]
+            barcodes, error = future.result()
             print(f'=== Testing {filename} ===')
-            
-            with open(filename, 'rb') as f:
-                pdf_data = f.read()
 
-            barcodes = barcode_extractor.extract_barcodes_from_pdf(pdf_data, filename)
+            if error is not None:
+                print(f'  {error}')
+                print()
+                continue
 
             print(f'Found {len(barcodes)} unique barcode(s)')
             for i, bc in enumerate(barcodes):
@@ -36,13 +53,6 @@ def test_barcode_deduplication():
                 print(f'    Methods: {bc.get("methods_used")}')
                 print(f'    Confidence: {bc.get("confidence")}')
                 print()
-                
-        except FileNotFoundError:
-            print(f'  File not found: {filename}')
-            print()
-        except Exception as e:
-            print(f'  Error processing {filename}: {e}')
-            print()
     
     print("=== Test completed ===")
 
@@ -3,161 +3,161 @@
 Test the enhanced barcode consolidation logic.
 """
 
-import os
-import sys
+from types import MappingProxyType
 
-# Add the project root to the path
-sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+import pytest
 
-def test_consolidation_scenarios():
-    """Test different consolidation scenarios."""
-    print("🧪 Testing Barcode Consolidation Logic")
-    print("=" * 50)
-    
-    from app.services.pass_generator import PassGenerator
-    
-    generator = PassGenerator()
-    
-    # Test Scenario 1: Duplicate identical barcodes (user's feedback scenario)
-    print("\n📋 Scenario 1: Duplicate Identical QR Codes")
-    print("-" * 30)
-    
-    duplicate_barcodes = [
-        {
-            'data': 'ABC123456789',
-            'type': 'QRCODE',
-            'source': 'text-analysis',
-            'method': 'text_extraction_text_alphanumeric',
-            'confidence': 75
-        },
-        {
-            'data': 'ABC123456789',  # Identical data
-            'type': 'QRCODE',
-            'source': 'text-analysis',
-            'method': 'text_extraction_text_alphanumeric',
-            'confidence': 75
-        }
-    ]
-    
-    result = generator._consolidate_barcodes_for_single_pass(duplicate_barcodes, "data_matrix_ticket.pdf")
-    print(f"Result: {len(result)} barcode(s)")
-    if result:
-        print(f"Selected: {result[0]['data']}, Method: {result[0].get('consolidation_method', 'none')}")
-    
-    # Test Scenario 2: Different Data Matrix codes (should consolidate by filename)
-    print("\n📋 Scenario 2: Multiple Data Matrix Codes")
-    print("-" * 30)
-    
-    datamatrix_barcodes = [
-        {
-            'data': '75930340250900',
-            'type': 'DATAMATRIX',
-            'source': 'text-analysis',
-            'method': 'text_extraction_text_numeric',
-            'confidence': 75
-        },
-        {
-            'data': '2412061957820407849',
-            'type': 'DATAMATRIX',
-            'source': 'text-analysis',
-            'method': 'text_extraction_text_numeric',
-            'confidence': 75
-        }
-    ]
-    
-    result = generator._consolidate_barcodes_for_single_pass(datamatrix_barcodes, "pass_with_data_matrix.pdf")
-    print(f"Result: {len(result)} barcode(s)")
-    if result:
-        print(f"Selected: {result[0]['data']}, Method: {result[0].get('consolidation_method', 'none')}")
-    
-    # Test Scenario 3: QR codes with datamatrix filename (should reclassify)
-    print("\n📋 Scenario 3: QR Codes with DataMatrix Filename")
-    print("-" * 30)
-    
-    qr_as_datamatrix = [
-        {
-            'data': 'MATRIX_CODE_12345',
-            'type': 'QRCODE',
-            'source': 'text-analysis',
-            'method': 'text_extraction_text_alphanumeric',
-            'confidence': 80
-        },
-        {
-            'data': 'MATRIX_CODE_67890',
-            'type': 'QRCODE',
-            'source': 'text-analysis',
-            'method': 'text_extraction_text_alphanumeric',
-            'confidence': 75
-        }
-    ]
-    
-    result = generator._consolidate_barcodes_for_single_pass(qr_as_datamatrix, "datamatrix_boarding_pass.pdf")
-    print(f"Result: {len(result)} barcode(s)")
-    if result:
-        print(f"Selected: {result[0]['data']}")
-        print(f"Type: {result[0]['type']} (was: {result[0].get('original_type', 'N/A')})")
-        print(f"Method: {result[0].get('consolidation_method', 'none')}")
-        print(f"Reclassified: {result[0].get('reclassified', False)}")
-    
-    # Test Scenario 4: Multiple different types (should not consolidate)
-    print("\n📋 Scenario 4: Mixed Barcode Types (No Consolidation)")
-    print("-" * 30)
-    
-    mixed_barcodes = [
-        {
-            'data': 'QR_DATA_123',
-            'type': 'QRCODE',
-            'source': 'visual-detection',
-            'method': 'standard',
-            'confidence': 90
-        },
-        {
-            'data': 'AZTEC_DATA_456',
-            'type': 'AZTEC',
-            'source': 'visual-detection',
-            'method': 'standard',
-            'confidence': 85
-        }
-    ]
-    
-    result = generator._consolidate_barcodes_for_single_pass(mixed_barcodes, "multi_ticket.pdf")
-    print(f"Result: {len(result)} barcode(s) (should be 2 - no consolidation)")
-    
-    # Test Scenario 5: Visual beats text (should prefer visual)
-    print("\n📋 Scenario 5: Visual Detection Priority")
+# Scenario fixtures are built once at import; read-only views so a test can't
+# accidentally change them. _fresh() hands the consolidator mutable copies.
+_DUPLICATE_BARCODES = (
+    MappingProxyType({
+        'data': 'ABC123456789',
+        'type': 'QRCODE',
+        'source': 'text-analysis',
+        'method': 'text_extraction_text_alphanumeric',
+        'confidence': 75
+    }),
+    MappingProxyType({
+        'data': 'ABC123456789',  # Identical data
+        'type': 'QRCODE',
+        'source': 'text-analysis',
+        'method': 'text_extraction_text_alphanumeric',
+        'confidence': 75
+    }),
+)
+
+_DATAMATRIX_BARCODES = (
+    MappingProxyType({
+        'data': '75930340250900',
+        'type': 'DATAMATRIX',
+        'source': 'text-analysis',
+        'method': 'text_extraction_text_numeric',
+        'confidence': 75
+    }),
+    MappingProxyType({
+        'data': '2412061957820407849',
+        'type': 'DATAMATRIX',
+        'source': 'text-analysis',
+        'method': 'text_extraction_text_numeric',
+        'confidence': 75
+    }),
+)
+
+_QR_AS_DATAMATRIX = (
+    MappingProxyType({
+        'data': 'MATRIX_CODE_12345',
+        'type': 'QRCODE',
+        'source': 'text-analysis',
+        'method': 'text_extraction_text_alphanumeric',
+        'confidence': 80
+    }),
+    MappingProxyType({
+        'data': 'MATRIX_CODE_67890',
+        'type': 'QRCODE',
+        'source': 'text-analysis',
+        'method': 'text_extraction_text_alphanumeric',
+        'confidence': 75
+    }),
+)
+
+_MIXED_BARCODES = (
+    MappingProxyType({
+        'data': 'QR_DATA_123',
+        'type': 'QRCODE',
+        'source': 'visual-detection',
+        'method': 'standard',
+        'confidence': 90
+    }),
+    MappingProxyType({
+        'data': 'AZTEC_DATA_456',
+        'type': 'AZTEC',
+        'source': 'visual-detection',
+        'method': 'standard',
+        'confidence': 85
+    }),
+)
+
+_MIXED_SOURCES = (
+    MappingProxyType({
+        'data': 'VISUAL_BARCODE',
+        'type': 'QRCODE',
+        'source': 'visual-detection',
+        'method': 'standard',
+        'confidence': 95
+    }),
+    MappingProxyType({
+        'data': 'TEXT_BARCODE_1',
+        'type': 'DATAMATRIX',
+        'source': 'text-analysis',
+        'method': 'text_extraction',
+        'confidence': 75
+    }),
+    MappingProxyType({
+        'data': 'TEXT_BARCODE_2',
+        'type': 'DATAMATRIX',
+        'source': 'text-analysis',
+        'method': 'text_extraction',
+        'confidence': 75
+    }),
+)
+
+
+def _fresh(fixture):
+    return [dict(bc) for bc in fixture]
+
+
+# (label, fixture, filename, expected result count, expected selected data)
+SCENARIOS = [
+    # User's feedback scenario
+    ("Duplicate Identical QR Codes", _DUPLICATE_BARCODES, "data_matrix_ticket.pdf", 1, "ABC123456789"),
+    # Should consolidate by filename (longest)
+    ("Multiple Data Matrix Codes", _DATAMATRIX_BARCODES, "pass_with_data_matrix.pdf", 1, "2412061957820407849"),
+    # Should reclassify as Data Matrix
+    ("QR Codes with DataMatrix Filename", _QR_AS_DATAMATRIX, "datamatrix_boarding_pass.pdf", 1, "MATRIX_CODE_12345"),
+    # Should not consolidate
+    ("Mixed Barcode Types (No Consolidation)", _MIXED_BARCODES, "multi_ticket.pdf", 2, None),
+    # Visual beats text
+    ("Visual Detection Priority", _MIXED_SOURCES, "ticket.pdf", 1, "VISUAL_BARCODE"),
+]
+
+
+def run_scenario(generator, number, label, fixture, filename, expected_count, expected_data):
+    """Consolidate one scenario's barcodes, print the outcome and check it."""
+    print(f"\n📋 Scenario {number}: {label}")
     print("-" * 30)
-    
-    mixed_sources = [
-        {
-            'data': 'VISUAL_BARCODE',
-            'type': 'QRCODE',
-            'source': 'visual-detection',
-            'method': 'standard',
-            'confidence': 95
-        },
-        {
-            'data': 'TEXT_BARCODE_1',
-            'type': 'DATAMATRIX',
-            'source': 'text-analysis',
-            'method': 'text_extraction',
-            'confidence': 75
-        },
-        {
-            'data': 'TEXT_BARCODE_2',
-            'type': 'DATAMATRIX',
-            'source': 'text-analysis',
-            'method': 'text_extraction',
-            'confidence': 75
-        }
-    ]
-    
-    result = generator._consolidate_barcodes_for_single_pass(mixed_sources, "ticket.pdf")
-    print(f"Result: {len(result)} barcode(s)")
-    if result:
-        print(f"Selected: {result[0]['data']} (source: {result[0]['source']})")
+
+    result = generator._consolidate_barcodes_for_single_pass(_fresh(fixture), filename)
+    print(f"Result: {len(result)} barcode(s) (expected {expected_count})")
+    if len(result) == 1:
+        selected = result[0]
+        print(f"Selected: {selected['data']} (source: {selected['source']})")
+        print(f"Type: {selected['type']} (was: {selected.get('original_type', 'N/A')})")
+        print(f"Method: {selected.get('consolidation_method', 'none')}")
+        print(f"Reclassified: {selected.get('reclassified', False)}")
+
+    assert len(result) == expected_count
+    if expected_data is not None:
+        assert result[0]['data'] == expected_data
+
+
+@pytest.mark.parametrize(
+    "number,label,fixture,filename,expected_count,expected_data",
+    [(i, *scenario) for i, scenario in enumerate(SCENARIOS, 1)],
+    ids=[scenario[0] for scenario in SCENARIOS],
+)
+def test_consolidation_scenario(pass_generator, number, label, fixture, filename, expected_count, expected_data):
+    """Test one barcode consolidation scenario."""
+    run_scenario(pass_generator, number, label, fixture, filename, expected_count, expected_data)
 
 if __name__ == "__main__":
-    test_consolidation_scenarios()
+    from app.services.pass_generator import PassGenerator
+
+    print("🧪 Testing Barcode Consolidation Logic")
+    print("=" * 50)
+
+    generator = PassGenerator()
+    for number, scenario in enumerate(SCENARIOS, 1):
+        run_scenario(generator, number, *scenario)
     
     print("\n" + "=" * 50)
     print("📊 CONSOLIDATION TEST SUMMARY")
@@ -1,49 +1,66 @@
 #!/usr/bin/env python3
 """Test contrast adjustment logic with various background colors."""
 
-import sys
-sys.path.append('.')
+import numpy as np
+import pytest
 
 from app.services.pass_generator import PassGenerator
 
-def test_contrast():
-    """Test contrast adjustment with various background colors."""
-    
-    test_colors = [
-        ("rgb(255,255,255)", "Pure white"),
-        ("rgb(240,240,240)", "Light gray"),
-        ("rgb(255,255,0)", "Yellow"),
-        ("rgb(124,196,125)", "Light green (Eiffel)"),
-        ("rgb(173,216,230)", "Light blue"),
-        ("rgb(255,192,203)", "Pink"),
-        ("rgb(128,128,128)", "Medium gray"),
-        ("rgb(100,100,100)", "Dark gray"),
-        ("rgb(0,0,255)", "Blue"),
-        ("rgb(255,0,0)", "Red"),
-        ("rgb(0,128,0)", "Green"),
-        ("rgb(128,0,128)", "Purple"),
-        ("rgb(0,0,0)", "Pure black"),
-    ]
-    
-    pass_gen = PassGenerator()
-    
+TEST_COLORS = [
+    ((255, 255, 255), "Pure white"),
+    ((240, 240, 240), "Light gray"),
+    ((255, 255, 0), "Yellow"),
+    ((124, 196, 125), "Light green (Eiffel)"),
+    ((173, 216, 230), "Light blue"),
+    ((255, 192, 203), "Pink"),
+    ((128, 128, 128), "Medium gray"),
+    ((100, 100, 100), "Dark gray"),
+    ((0, 0, 255), "Blue"),
+    ((255, 0, 0), "Red"),
+    ((0, 128, 0), "Green"),
+    ((128, 0, 128), "Purple"),
+    ((0, 0, 0), "Pure black"),
+]
+
+# WCAG relative luminance for every background in one vectorized pass;
+# used as ground truth for the light/dark text choice below.
+_rgb = np.array([c for c, _ in TEST_COLORS], dtype=np.float64) / 255.0
+_linear = np.where(_rgb <= 0.03928, _rgb / 12.92, ((_rgb + 0.055) / 1.055) ** 2.4)
+LUMINANCE = dict(zip((c for c, _ in TEST_COLORS), _linear @ np.array([0.2126, 0.7152, 0.0722])))
+
+
+def check_contrast(pass_gen, rgb, description):
+    """Run _ensure_color_contrast on one background and check the text color."""
+    r, g, b = rgb
+    lum = LUMINANCE[rgb]
+    bg_color = f"rgb({r},{g},{b})"
+    print(f"\n🎨 Testing: {description}")
+    print(f"   Input background: {bg_color} (luminance {lum:.3f})")
+
+    # Test with default white text
+    bg_adj, fg_adj, label_adj = pass_gen._ensure_color_contrast(
+        bg_color, "rgb(255,255,255)", "rgb(255,255,255)"
+    )
+
+    print(f"   Output foreground: {fg_adj}")
+    print(f"   Output label: {label_adj}")
+    print("-" * 40)
+
+    expected_fg = "rgb(0, 0, 0)" if lum > 0.25 else "rgb(255, 255, 255)"
+    assert fg_adj == expected_fg, f"{description}: expected {expected_fg}, got {fg_adj}"
+
+
+@pytest.mark.parametrize("rgb,description", TEST_COLORS, ids=[d for _, d in TEST_COLORS])
+def test_contrast(pass_generator, rgb, description):
+    """Test contrast adjustment for one background color."""
+    check_contrast(pass_generator, rgb, description)
+
+if __name__ == '__main__':
     print("="*80)
     print("CONTRAST ADJUSTMENT TEST RESULTS")
     print("="*80)
     print()
-    
-    for bg_color, description in test_colors:
-        print(f"\n🎨 Testing: {description}")
-        print(f"   Input background: {bg_color}")
-        
-        # Test with default white text
-        bg_adj, fg_adj, label_adj = pass_gen._ensure_color_contrast(
-            bg_color, "rgb(255,255,255)", "rgb(255,255,255)"
-        )
-        
-        print(f"   Output foreground: {fg_adj}")
-        print(f"   Output label: {label_adj}")
-        print("-" * 40)
 
-if __name__ == '__main__':
-    test_contrast()
\ No newline at end of file
+    generator = PassGenerator()
+    for rgb, description in TEST_COLORS:
+        check_contrast(generator, rgb, description)
@@ -1,20 +1,30 @@
 #!/usr/bin/env python3
 """Test the Eiffel Tower ticket to see exact metadata response."""
 
-import sys
 import json
 import asyncio
 from pathlib import Path
-sys.path.append('.')
 
-from app.services.pass_generator import PassGenerator
+import pytest
+
 from app.services.ai_service import AIService
-from app.services.barcode_extractor import barcode_extractor
 
-async def test_eiffel_tower():
+def _extract_text(pdf_data):
+    """All page text via PyMuPDF."""
+    import fitz  # PyMuPDF
+    with fitz.open(stream=pdf_data, filetype="pdf") as doc:
+        return "".join(page.get_text() for page in doc)
+
+def _extract_barcodes(pdf_data):
+    """Visual barcode extraction; needs the native zbar library."""
+    from app.services.barcode_extractor import barcode_extractor
+    return barcode_extractor.extract_barcodes_from_pdf(pdf_data, "torre ifel.pdf")
+
+@pytest.mark.asyncio
+async def test_eiffel_tower(pass_generator):
     """Process torre ifel.pdf and show the exact metadata response."""
     
-    pdf_file = Path("test_files/torre ifel.pdf")
+    pdf_file = Path(__file__).parent / "test_files" / "torre ifel.pdf"
     if not pdf_file.exists():
         print(f"❌ File not found: {pdf_file}")
         return
@@ -27,14 +37,13 @@ async def test_eiffel_tower():
     with open(pdf_file, 'rb') as f:
         pdf_data = f.read()
     
+    # Barcode scanning is CPU-bound and independent of the text/AI steps,
+    # so it runs in a worker thread while they proceed
+    barcode_task = asyncio.create_task(asyncio.to_thread(_extract_barcodes, pdf_data))
+    
     # Step 1: Extract text
     print("\n📄 Step 1: Extracting text from PDF...")
-    import fitz  # PyMuPDF
-    doc = fitz.open(stream=pdf_data, filetype="pdf")
-    pdf_text = ""
-    for page in doc:
-        pdf_text += page.get_text()
-    doc.close()
+    pdf_text = await asyncio.to_thread(_extract_text, pdf_data)
     print(f"Extracted {len(pdf_text)} characters of text")
     
     # Step 2: AI Analysis (optional - may fail without API key)
@@ -52,13 +61,19 @@ async def test_eiffel_tower():
     
     # Step 3: Generate pass with colors
     print("\n🎨 Step 3: Generating pass with color extraction...")
-    pass_generator = PassGenerator()
+    
+    (barcodes,) = await asyncio.gather(barcode_task, return_exceptions=True)
+    if isinstance(barcodes, Exception):
+        print(f"⚠️ Barcode extraction failed: {barcodes}")
+        barcodes = []
     
     try:
         pkpass_files, detected_barcodes, ticket_info, warnings = pass_generator.create_pass_from_pdf_data(
             pdf_data, 
             "torre ifel.pdf",
-            ai_metadata
+            ai_metadata,
+            pdf_text=pdf_text,  # reuse the Step 1 text instead of re-parsing
+            barcodes=barcodes
         )
         
         print(f"\n✅ Generated {len(pkpass_files)} pass(es)")
@@ -100,4 +115,6 @@ async def test_eiffel_tower():
         traceback.print_exc()
 
 if __name__ == '__main__':
-    asyncio.run(test_eiffel_tower())
\ No newline at end of file
+    from app.services.pass_generator import pass_generator
+
+    asyncio.run(test_eiffel_tower(pass_generator))
\ No newline at end of file
@@ -0,0 +1,25 @@
+"""Buffered stdout for the chatty diagnostic test scripts."""
+
+import contextlib
+import functools
+import io
+import sys
+
+
+def buffered_stdout(func):
+    """Collect everything *func* prints and write it to stdout in one go.
+
+    The diagnostic tests print dozens of lines per PDF; writing them as one
+    block avoids a terminal write per line and keeps the report contiguous
+    when several workers share a terminal (pytest -n).
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        buf = io.StringIO()
+        try:
+            with contextlib.redirect_stdout(buf):
+                return func(*args, **kwargs)
+        finally:
+            sys.stdout.write(buf.getvalue())
+            sys.stdout.flush()
+    return wrapper
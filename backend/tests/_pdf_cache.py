@@ -0,0 +1,119 @@
+"""Memoized PDF rasterization shared by barcode tests.
+
+Rasterizing with poppler (pdf2image) is the slowest step in the barcode
+tests, and the same PDF is often rendered at the same DPI by a test and then
+again by the extractor pipeline. Images are cached per (SHA-1 of the PDF,
+dpi, options), so every later request is a dictionary hit.
+
+Renders are also written as PNGs under tests/.cache/rasters (git-ignored),
+keyed by SHA-256 of the PDF, dpi and options, so later runs skip poppler
+entirely. Writes are atomic renames, so parallel pytest-xdist workers can
+share the directory. Delete it to force fresh renders.
+"""
+
+import hashlib
+import mmap
+import os
+from collections import OrderedDict
+
+from pdf2image import convert_from_bytes
+from PIL import Image
+
+# Page images at 400-600 DPI are large; keep only a handful of PDFs around
+_MAXSIZE = 4
+_cache = OrderedDict()
+
+_DISK_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "rasters")
+# Options that don't change the rendered pixels
+_NON_RENDER_OPTIONS = ("thread_count",)
+# Options that change what convert_from_bytes returns; bypass the disk cache
+_UNCACHEABLE_OPTIONS = ("output_folder", "paths_only", "single_file")
+
+# File contents by (path, mtime, size); the sample PDFs are small enough to keep
+_file_cache = {}
+
+
+def read_pdf(path):
+    """Return the bytes of *path*, read once per session through an mmap.
+
+    PyMuPDF only accepts bytes-like streams it owns (not an mmap), so every
+    consumer needs real bytes; sharing one copy avoids re-reading per test.
+    """
+    st = os.stat(path)
+    key = (path, st.st_mtime_ns, st.st_size)
+    data = _file_cache.get(key)
+    if data is None:
+        with open(path, "rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                data = bytes(mm)
+        _file_cache[key] = data
+    return data
+
+
+def cached_convert_from_bytes(pdf_file, dpi=200, **kwargs):
+    """Drop-in replacement for pdf2image.convert_from_bytes with memoization.
+
+    Returns the cached list of PIL images; callers must not modify them in
+    place (np.array(image) already makes a copy).
+    """
+    key = (hashlib.sha1(pdf_file).digest(), dpi, tuple(sorted(kwargs.items())))
+    images = _cache.get(key)
+    if images is not None:
+        _cache.move_to_end(key)
+        return images
+
+    images = _disk_convert(pdf_file, dpi, kwargs)
+    _cache[key] = images
+    if len(_cache) > _MAXSIZE:
+        _cache.popitem(last=False)
+    return images
+
+
+def rasterize(pdf_bytes, dpi, **kwargs):
+    """Cached page images of *pdf_bytes* at *dpi* (extra pdf2image options allowed)."""
+    return cached_convert_from_bytes(pdf_bytes, dpi=dpi, **kwargs)
+
+
+def _disk_stem(pdf_file, dpi, kwargs):
+    """File-name stem for a render: PDF digest, dpi and a digest of the options."""
+    options = sorted((k, v) for k, v in kwargs.items() if k not in _NON_RENDER_OPTIONS)
+    opts = hashlib.sha256(repr(options).encode()).hexdigest()[:8]
+    return f"{hashlib.sha256(pdf_file).hexdigest()[:16]}_{dpi}_{opts}"
+
+
+def _disk_convert(pdf_file, dpi, kwargs):
+    """convert_from_bytes backed by PNGs on disk."""
+    if any(k in kwargs for k in _UNCACHEABLE_OPTIONS):
+        return convert_from_bytes(pdf_file, dpi=dpi, **kwargs)
+
+    stem = os.path.join(_DISK_DIR, _disk_stem(pdf_file, dpi, kwargs))
+    try:
+        with open(stem + ".pages") as f:
+            page_count = int(f.read())
+        images = []
+        for page in range(1, page_count + 1):
+            image = Image.open(f"{stem}_p{page}.png")
+            image.load()
+            images.append(image)
+        return images
+    except (OSError, ValueError):
+        pass
+
+    images = convert_from_bytes(pdf_file, dpi=dpi, **kwargs)
+    try:
+        os.makedirs(_DISK_DIR, exist_ok=True)
+        # Every file is written under a per-process name and renamed into
+        # place, so pytest-xdist workers rendering the same PDF never see
+        # each other's partial files
+        suffix = f".{os.getpid()}"
+        for page, image in enumerate(images, 1):
+            # Fast, light compression: these are read back far more than written
+            image.save(f"{stem}_p{page}.png{suffix}", format="PNG", compress_level=1)
+            os.replace(f"{stem}_p{page}.png{suffix}", f"{stem}_p{page}.png")
+        # Page count goes last so a half-written render is never used
+        with open(stem + ".pages" + suffix, "w") as f:
+            f.write(str(len(images)))
+        os.replace(stem + ".pages" + suffix, stem + ".pages")
+    except OSError:
+        pass  # a read-only checkout just loses the disk cache
+    return images
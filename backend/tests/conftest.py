@@ -23,3 +23,9 @@ TEST_PDFS = [
     "tickets_7587005.pdf",
     "torre ifel.pdf",
 ]
+
+
+@pytest.fixture(scope="session")
+def format_groups(barcode_extractor):
+    """The extractor's ordered format groups."""
+    return barcode_extractor.format_groups
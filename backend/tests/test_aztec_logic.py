@@ -1,131 +1,48 @@
 """Tests for Aztec code logic without external dependencies."""
 
 import sys
-import os
 import unittest
+from collections import namedtuple
 from unittest.mock import Mock, patch
 
-# Add project root to path
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import pytest
+
+
+# The fields of a pyzbar decode result that _calculate_confidence reads
+Barcode = namedtuple("Barcode", "type data")
 
 
 class TestAztecLogic(unittest.TestCase):
     """Test Aztec code detection logic without requiring pyzbar/opencv."""
     
-    def setUp(self):
-        """Set up test fixtures."""
+    @classmethod
+    def setUpClass(cls):
+        """Set up test fixtures once; the extractor holds no per-test state."""
         # Mock the external dependencies to avoid import errors
-        self.pyzbar_mock = Mock()
-        self.cv2_mock = Mock()
-        self.np_mock = Mock()
+        cls.pyzbar_mock = Mock()
+        cls.cv2_mock = Mock()
+        cls.np_mock = Mock()
         
         # Patch imports before importing our module
-        self.patches = [
-            patch('app.services.barcode_extractor.pyzbar', self.pyzbar_mock),
-            patch('app.services.barcode_extractor.cv2', self.cv2_mock),
-            patch('app.services.barcode_extractor.np', self.np_mock),
+        cls.patches = [
+            patch('app.services.barcode_extractor.pyzbar', cls.pyzbar_mock),
+            patch('app.services.barcode_extractor.cv2', cls.cv2_mock),
+            patch('app.services.barcode_extractor.np', cls.np_mock),
         ]
         
-        for p in self.patches:
+        for p in cls.patches:
             p.start()
         
         # Now import after patching
         from app.services.barcode_extractor import BarcodeExtractor
-        self.extractor = BarcodeExtractor()
+        cls.extractor = BarcodeExtractor()
     
-    def tearDown(self):
+    @classmethod
+    def tearDownClass(cls):
         """Clean up patches."""
-        for p in self.patches:
+        for p in cls.patches:
             p.stop()
     
-    def test_format_groups_order(self):
-        """Test that format groups are in correct order for Aztec precedence."""
-        # Aztec should be first
-        self.assertEqual(self.extractor.format_groups[0], {'AZTEC'})
-        
-        # QR should be second
-        self.assertEqual(self.extractor.format_groups[1], {'QRCODE'})
-        
-        # 1D codes should be third
-        one_d_group = self.extractor.format_groups[2]
-        self.assertIn('CODE128', one_d_group)
-        self.assertIn('PDF417', one_d_group)
-        self.assertIn('EAN13', one_d_group)
-    
-    def test_mixed_aztec_qr_filename_hint(self):
-        """Test mixed handling with filename hints."""
-        aztec_code = {'type': 'AZTEC', 'data': 'aztec_data', 'area': 500}
-        qr_code = {'type': 'QRCODE', 'data': 'qr_data', 'area': 1000}
-        other_code = {'type': 'CODE128', 'data': 'code128_data', 'area': 300}
-        
-        barcodes = [aztec_code, qr_code, other_code]
-        
-        # Test with Aztec hint in filename
-        result = self.extractor._handle_mixed_aztec_qr(barcodes, "ticket_aztec_123.pdf")
-        
-        # Should return Aztec + others, no QR
-        self.assertEqual(len(result), 2)
-        types = [bc['type'] for bc in result]
-        self.assertIn('AZTEC', types)
-        self.assertIn('CODE128', types)
-        self.assertNotIn('QRCODE', types)
-    
-    def test_mixed_aztec_qr_billet_hint(self):
-        """Test mixed handling with billet hint."""
-        aztec_code = {'type': 'AZTEC', 'data': 'aztec_data', 'area': 500}
-        qr_code = {'type': 'QRCODE', 'data': 'qr_data', 'area': 1000}
-        
-        barcodes = [aztec_code, qr_code]
-        
-        # Test with billet hint (French for ticket)
-        result = self.extractor._handle_mixed_aztec_qr(barcodes, "billet_train.pdf")
-        
-        # Should prefer Aztec despite smaller area
-        types = [bc['type'] for bc in result]
-        self.assertIn('AZTEC', types)
-        self.assertNotIn('QRCODE', types)
-    
-    def test_mixed_aztec_qr_area_preference(self):
-        """Test mixed handling with area preference."""
-        aztec_code = {'type': 'AZTEC', 'data': 'aztec_data', 'area': 1200}  # Larger
-        qr_code = {'type': 'QRCODE', 'data': 'qr_data', 'area': 800}
-        
-        barcodes = [aztec_code, qr_code]
-        
-        # Test with no hint - should prefer larger Aztec
-        result = self.extractor._handle_mixed_aztec_qr(barcodes, "document.pdf")
-        
-        types = [bc['type'] for bc in result]
-        self.assertIn('AZTEC', types)
-        self.assertNotIn('QRCODE', types)
-    
-    def test_mixed_aztec_qr_prefer_larger_qr(self):
-        """Test mixed handling preferring larger QR."""
-        aztec_code = {'type': 'AZTEC', 'data': 'aztec_data', 'area': 600}
-        qr_code = {'type': 'QRCODE', 'data': 'qr_data', 'area': 1200}  # Larger
-        
-        barcodes = [aztec_code, qr_code]
-        
-        # Test with no hint - should prefer larger QR
-        result = self.extractor._handle_mixed_aztec_qr(barcodes, "document.pdf")
-        
-        types = [bc['type'] for bc in result]
-        self.assertIn('QRCODE', types)
-        self.assertNotIn('AZTEC', types)
-    
-    def test_choose_best_barcodes_confidence(self):
-        """Test barcode selection by confidence."""
-        barcodes = [
-            {'confidence': 70, 'area': 1000, 'center_distance': 100, 'data': 'low_confidence'},
-            {'confidence': 90, 'area': 500, 'center_distance': 50, 'data': 'high_confidence'},
-            {'confidence': 90, 'area': 1200, 'center_distance': 75, 'data': 'high_conf_large'}
-        ]
-        
-        result = self.extractor._choose_best_barcodes(barcodes)
-        self.assertEqual(len(result), 1)
-        # Should pick highest confidence with largest area
-        self.assertEqual(result[0]['data'], 'high_conf_large')
-    
     def test_choose_best_barcodes_area_tiebreaker(self):
         """Test barcode selection by area when confidence is equal."""
         barcodes = [
@@ -196,9 +113,7 @@ class TestAztecLogic(unittest.TestCase):
     
     def test_calculate_confidence_aztec(self):
         """Test confidence calculation for Aztec codes."""
-        mock_barcode = Mock()
-        mock_barcode.type = 'AZTEC'
-        mock_barcode.data = b'long_data_string_for_testing'
+        mock_barcode = Barcode('AZTEC', b'long_data_string_for_testing')
         
         confidence = self.extractor._calculate_confidence(mock_barcode)
         
@@ -207,9 +122,7 @@ class TestAztecLogic(unittest.TestCase):
     
     def test_calculate_confidence_short_data(self):
         """Test confidence calculation for short data."""
-        mock_barcode = Mock()
-        mock_barcode.type = 'CODE39'
-        mock_barcode.data = b'short'
+        mock_barcode = Barcode('CODE39', b'short')
         
         confidence = self.extractor._calculate_confidence(mock_barcode)
         
@@ -217,43 +130,5 @@ class TestAztecLogic(unittest.TestCase):
         self.assertEqual(confidence, 70)
 
 
-def run_logic_tests():
-    """Run the logic tests and print results."""
-    print("🧪 Running Aztec Code Logic Tests (No External Dependencies)")
-    print("=" * 60)
-    
-    # Discover and run tests
-    loader = unittest.TestLoader()
-    suite = loader.loadTestsFromTestCase(TestAztecLogic)
-    
-    # Run tests with verbose output
-    runner = unittest.TextTestRunner(verbosity=2)
-    result = runner.run(suite)
-    
-    print("\n" + "=" * 60)
-    print("📊 TEST RESULTS")
-    print("=" * 60)
-    
-    if result.wasSuccessful():
-        print("🎉 All logic tests passed!")
-        print(f"✅ {result.testsRun} tests passed")
-    else:
-        print("⚠️  Some logic tests failed")
-        print(f"❌ {len(result.failures)} failures, {len(result.errors)} errors")
-        
-        if result.failures:
-            print("\nFailures:")
-            for test, failure in result.failures:
-                print(f"  - {test}: {failure}")
-        
-        if result.errors:
-            print("\nErrors:")
-            for test, error in result.errors:
-                print(f"  - {test}: {error}")
-    
-    return result.wasSuccessful()
-
-
 if __name__ == "__main__":
-    success = run_logic_tests()
-    exit(0 if success else 1)
\ No newline at end of file
+    sys.exit(pytest.main([__file__, "-v"]))
@@ -1,64 +1,82 @@
 """Tests for the barcode extractor service with Aztec code support."""
 
 import pytest
-import os
-import sys
+import logging
+from collections import namedtuple
+
 import numpy as np
-from unittest.mock import Mock, patch, MagicMock
+from unittest.mock import patch
+
+from app.services.barcode_extractor import barcode_extractor
+from tests._pdf_cache import rasterize
+
+logger = logging.getLogger(__name__)
+
+
+def _blank(*shape):
+    """Read-only all-black uint8 image; shared, since no test writes to it."""
+    image = np.zeros(shape, dtype=np.uint8)
+    image.setflags(write=False)
+    return image
+
+
+BLANK_100 = _blank(100, 100, 3)
+BLANK_200 = _blank(200, 200, 3)
+BLANK_300 = _blank(300, 300, 3)
+GRAY_200 = _blank(200, 200)
+# 300 wide x 200 high, for center-distance math
+CENTER_IMG = _blank(200, 300, 3)
+
+# Stand-ins for pyzbar's decode results; plain tuples, as pyzbar's own are
+Rect = namedtuple("Rect", "left top width height")
+Barcode = namedtuple("Barcode", "type data rect")
+
+
+def _fake_decode(data_by_type):
+    """decode_with_formats stand-in: one barcode per format group found in *data_by_type*."""
+    table = {frozenset({t}): data for t, data in data_by_type.items()}
 
-# Add the project root to the path
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    def decode(image, formats, try_harder=True):
+        data = table.get(frozenset(formats))
+        # A fresh dict per call: _try_formats adds page/method fields to it
+        return [{'type': next(iter(formats)), 'data': data}] if data is not None else []
 
-from app.services.barcode_extractor import BarcodeExtractor
+    return decode
 
 
 class TestBarcodeExtractor:
     """Test cases for BarcodeExtractor with Aztec support."""
     
-    def setup_method(self):
-        """Set up test fixtures."""
-        self.extractor = BarcodeExtractor()
-        self.test_files_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "test_files")
-    
-    def test_format_groups_initialization(self):
-        """Test that format groups are properly initialized."""
-        assert len(self.extractor.format_groups) == 4
-        assert {'AZTEC'} == self.extractor.format_groups[0]
-        assert {'DATAMATRIX'} == self.extractor.format_groups[1]
-        assert {'QRCODE'} == self.extractor.format_groups[2]
-        assert 'CODE128' in self.extractor.format_groups[3]
+    @classmethod
+    def setup_class(cls):
+        """Share the extractor singleton for the whole class."""
+        cls.extractor = barcode_extractor
     
     def test_decode_with_formats_empty_image(self):
         """Test decode_with_formats with empty image."""
         # Create a blank image
-        blank_image = np.zeros((100, 100, 3), dtype=np.uint8)
+        blank_image = BLANK_100
         
-        result = self.extractor.decode_with_formats(blank_image, {'AZTEC'})
+        result = self.extractor.decode_with_formats(blank_image, {'QRCODE'})
         assert result == []
     
     def test_decode_with_formats_filter_by_format(self):
         """Test that decode_with_formats properly filters by format."""
         with patch('app.services.barcode_extractor.pyzbar.decode') as mock_decode:
-            # Mock pyzbar to return both Aztec and QR codes
-            mock_barcode_aztec = Mock()
-            mock_barcode_aztec.type = 'AZTEC'
-            mock_barcode_aztec.data = b'aztec_data'
-            mock_barcode_aztec.rect = Mock(left=10, top=20, width=50, height=60)
+            # Mock pyzbar to return both PDF417 and QR codes
+            mock_barcode_pdf417 = Barcode('PDF417', b'pdf417_data', Rect(10, 20, 50, 60))
             
-            mock_barcode_qr = Mock()
-            mock_barcode_qr.type = 'QRCODE'
-            mock_barcode_qr.data = b'qr_data'
-            mock_barcode_qr.rect = Mock(left=100, top=200, width=80, height=90)
+            mock_barcode_qr = Barcode('QRCODE', b'qr_data', Rect(100, 200, 80, 90))
             
-            mock_decode.return_value = [mock_barcode_aztec, mock_barcode_qr]
+            mock_decode.return_value = [mock_barcode_pdf417, mock_barcode_qr]
             
-            blank_image = np.zeros((300, 300, 3), dtype=np.uint8)
+            blank_image = BLANK_300
             
-            # Test filtering for Aztec only
-            aztec_result = self.extractor.decode_with_formats(blank_image, {'AZTEC'})
-            assert len(aztec_result) == 1
-            assert aztec_result[0]['type'] == 'AZTEC'
-            assert aztec_result[0]['data'] == 'aztec_data'
+            # Test filtering for PDF417 only
+            pdf417_result = self.extractor.decode_with_formats(blank_image, {'PDF417'})
+            assert len(pdf417_result) == 1
+            assert pdf417_result[0]['type'] == 'PDF417'
+            assert pdf417_result[0]['data'] == 'pdf417_data'
             
             # Test filtering for QR only
             qr_result = self.extractor.decode_with_formats(blank_image, {'QRCODE'})
@@ -66,6 +84,13 @@ class TestBarcodeExtractor:
             assert qr_result[0]['type'] == 'QRCODE'
             assert qr_result[0]['data'] == 'qr_data'
     
+    @pytest.mark.parametrize("formats", [{'AZTEC'}, {'DATAMATRIX'}])
+    def test_decode_with_formats_skips_zbar_for_unreadable_formats(self, formats):
+        """zbar has no Aztec or Data Matrix reader, so it is not run for those groups."""
+        with patch('app.services.barcode_extractor.pyzbar.decode') as mock_decode:
+            assert self.extractor.decode_with_formats(BLANK_100, formats) == []
+            mock_decode.assert_not_called()
+    
     def test_choose_best_barcodes_single(self):
         """Test _choose_best_barcodes with single barcode."""
         barcode = {'confidence': 80, 'area': 1000, 'center_distance': 50}
@@ -88,72 +113,46 @@ class TestBarcodeExtractor:
     
     def test_calculate_center_distance(self):
         """Test _calculate_center_distance calculation."""
-        image = np.zeros((200, 300, 3), dtype=np.uint8)  # 300x200 image
+        image = CENTER_IMG
         
         # Mock rectangle at center
-        mock_rect = Mock(left=125, top=75, width=50, height=50)  # Center at (150, 100)
+        mock_rect = Rect(125, 75, 50, 50)  # Center at (150, 100)
         distance = self.extractor._calculate_center_distance(image, mock_rect)
         
         # Image center is at (150, 100), barcode center is at (150, 100)
         assert distance == 0.0
         
         # Mock rectangle off-center
-        mock_rect_off = Mock(left=0, top=0, width=50, height=50)  # Center at (25, 25)
+        mock_rect_off = Rect(0, 0, 50, 50)  # Center at (25, 25)
         distance_off = self.extractor._calculate_center_distance(image, mock_rect_off)
         assert distance_off > 0
     
-    def test_handle_mixed_aztec_qr_aztec_hint(self):
-        """Test mixed Aztec/QR handling with filename hint."""
-        aztec_code = {'type': 'AZTEC', 'data': 'aztec_data', 'area': 500}
-        qr_code = {'type': 'QRCODE', 'data': 'qr_data', 'area': 1000}
-        other_code = {'type': 'CODE128', 'data': 'code128_data', 'area': 300}
-        
-        barcodes = [aztec_code, qr_code, other_code]
-        
-        # Test with Aztec hint in filename
-        result = self.extractor._handle_mixed_aztec_qr(barcodes, "ticket_aztec_123.pdf")
-        assert len(result) == 2  # Aztec + others, no QR
-        assert any(bc['type'] == 'AZTEC' for bc in result)
-        assert any(bc['type'] == 'CODE128' for bc in result)
-        assert not any(bc['type'] == 'QRCODE' for bc in result)
-    
-    def test_handle_mixed_aztec_qr_area_preference(self):
-        """Test mixed Aztec/QR handling with area preference."""
-        aztec_code = {'type': 'AZTEC', 'data': 'aztec_data', 'area': 1200}  # Larger
-        qr_code = {'type': 'QRCODE', 'data': 'qr_data', 'area': 800}
-        other_code = {'type': 'CODE128', 'data': 'code128_data', 'area': 300}
-        
-        barcodes = [aztec_code, qr_code, other_code]
-        
-        # Test with no hint - should prefer larger Aztec
-        result = self.extractor._handle_mixed_aztec_qr(barcodes, "document.pdf")
-        assert any(bc['type'] == 'AZTEC' for bc in result)
-        assert not any(bc['type'] == 'QRCODE' for bc in result)
-    
-    def test_handle_mixed_aztec_qr_qr_preference(self):
-        """Test mixed Aztec/QR handling preferring QR when larger."""
-        aztec_code = {'type': 'AZTEC', 'data': 'aztec_data', 'area': 600}
-        qr_code = {'type': 'QRCODE', 'data': 'qr_data', 'area': 1200}  # Larger
-        
-        barcodes = [aztec_code, qr_code]
+    @pytest.mark.parametrize("aztec_area,qr_area,filename,expected_types", [
+        (500, 1000, "ticket_aztec_123.pdf", ['AZTEC', 'CODE128']),  # filename hint beats area
+        (500, 1000, "billet_train.pdf", ['AZTEC', 'CODE128']),      # billet (French for ticket) hint
+        (1200, 800, "document.pdf", ['AZTEC', 'CODE128']),          # no hint: larger Aztec wins
+        (600, 1200, "document.pdf", ['QRCODE', 'CODE128']),         # no hint: larger QR wins
+    ])
+    def test_handle_mixed_aztec_qr(self, aztec_area, qr_area, filename, expected_types):
+        """Test mixed Aztec/QR handling: one of the two is dropped, other codes are kept."""
+        barcodes = [
+            {'type': 'AZTEC', 'data': 'aztec_data', 'area': aztec_area},
+            {'type': 'QRCODE', 'data': 'qr_data', 'area': qr_area},
+            {'type': 'CODE128', 'data': 'code128_data', 'area': 300},
+        ]
         
-        # Test with no hint - should prefer larger QR
-        result = self.extractor._handle_mixed_aztec_qr(barcodes, "document.pdf")
-        assert any(bc['type'] == 'QRCODE' for bc in result)
-        assert not any(bc['type'] == 'AZTEC' for bc in result)
+        result = self.extractor._handle_mixed_aztec_qr(barcodes, filename)
+        assert [bc['type'] for bc in result] == expected_types
     
     def test_encoding_detection_utf8(self):
         """Test UTF-8 encoding detection."""
         with patch('app.services.barcode_extractor.pyzbar.decode') as mock_decode:
-            mock_barcode = Mock()
-            mock_barcode.type = 'AZTEC'
-            mock_barcode.data = 'Hello World'.encode('utf-8')
-            mock_barcode.rect = Mock(left=10, top=20, width=50, height=60)
+            mock_barcode = Barcode('QRCODE', 'Hello World'.encode('utf-8'), Rect(10, 20, 50, 60))
             
             mock_decode.return_value = [mock_barcode]
             
-            blank_image = np.zeros((100, 100, 3), dtype=np.uint8)
-            result = self.extractor.decode_with_formats(blank_image, {'AZTEC'})
+            blank_image = BLANK_100
+            result = self.extractor.decode_with_formats(blank_image, {'QRCODE'})
             
             assert len(result) == 1
             assert result[0]['encoding'] == 'utf-8'
@@ -165,15 +164,12 @@ class TestBarcodeExtractor:
             # Create bytes that are not valid UTF-8 but valid ISO-8859-1
             invalid_utf8_bytes = b'\x80\x81\x82'  # Not valid UTF-8
             
-            mock_barcode = Mock()
-            mock_barcode.type = 'AZTEC'
-            mock_barcode.data = invalid_utf8_bytes
-            mock_barcode.rect = Mock(left=10, top=20, width=50, height=60)
+            mock_barcode = Barcode('QRCODE', invalid_utf8_bytes, Rect(10, 20, 50, 60))
             
             mock_decode.return_value = [mock_barcode]
             
-            blank_image = np.zeros((100, 100, 3), dtype=np.uint8)
-            result = self.extractor.decode_with_formats(blank_image, {'AZTEC'})
+            blank_image = BLANK_100
+            result = self.extractor.decode_with_formats(blank_image, {'QRCODE'})
             
             assert len(result) == 1
             assert result[0]['encoding'] == 'iso-8859-1'
@@ -181,15 +177,12 @@ class TestBarcodeExtractor:
     def test_return_structure_complete(self):
         """Test that return structure includes all required fields."""
         with patch('app.services.barcode_extractor.pyzbar.decode') as mock_decode:
-            mock_barcode = Mock()
-            mock_barcode.type = 'AZTEC'
-            mock_barcode.data = b'test_data'
-            mock_barcode.rect = Mock(left=10, top=20, width=50, height=60)
+            mock_barcode = Barcode('PDF417', b'test_data', Rect(10, 20, 50, 60))
             
             mock_decode.return_value = [mock_barcode]
             
-            blank_image = np.zeros((100, 100, 3), dtype=np.uint8)
-            result = self.extractor.decode_with_formats(blank_image, {'AZTEC'})
+            blank_image = BLANK_100
+            result = self.extractor.decode_with_formats(blank_image, {'PDF417'})
             
             assert len(result) == 1
             barcode = result[0]
@@ -201,28 +194,20 @@ class TestBarcodeExtractor:
                 assert field in barcode, f"Missing field: {field}"
             
             # Check specific values
-            assert barcode['format'] == 'PKBarcodeFormatAztec'
+            assert barcode['format'] == 'PKBarcodeFormatPDF417'
             assert barcode['bbox'] == [10, 20, 50, 60]
             assert barcode['area'] == 3000  # 50 * 60
     
-    def test_data_matrix_detection_integration(self):
+    def test_data_matrix_detection_integration(self, data_matrix_barcodes):
         """Integration test with actual Data Matrix PDF."""
-        test_file = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "test_files", "pass_with_data_matrix.pdf")
-        
-        if not os.path.exists(test_file):
-            pytest.skip(f"Test file not found: {test_file}")
-        
-        with open(test_file, 'rb') as f:
-            pdf_data = f.read()
-        
-        result = self.extractor.extract_barcodes_from_pdf(pdf_data, "pass_with_data_matrix.pdf")
+        result = data_matrix_barcodes
         
         # Should find at least one barcode
         assert len(result) > 0, f"No barcodes found in PDF. Result: {result}"
         
         # Should detect Data Matrix format
-        datamatrix_found = any(bc['type'] == 'DATAMATRIX' for bc in result)
-        assert datamatrix_found, f"Data Matrix code not detected. Found types: {[bc['type'] for bc in result]}"
+        types = {bc['type'] for bc in result}
+        assert 'DATAMATRIX' in types, f"Data Matrix code not detected. Found types: {types}"
         
         # Check that result has proper structure
         for barcode in result:
@@ -233,96 +218,83 @@ class TestBarcodeExtractor:
             assert 'type' in barcode
         
         # Log found barcodes
-        print(f"Found {len(result)} barcodes")
+        logger.debug("Found %d barcodes", len(result))
         for i, bc in enumerate(result, 1):
-            print(f"  {i}. Type: {bc['type']}, Format: {bc['format']}, Data: {bc['data'][:50]}...")
+            logger.debug("  %d. Type: %s, Format: %s, Data: %.50s...", i, bc['type'], bc['format'], bc['data'])
     
-    def test_data_matrix_pdf_multiple_dpi_processing(self):
+    def test_data_matrix_pdf_multiple_dpi_processing(self, data_matrix_pdf):
         """Test Data Matrix PDF processing at different DPI levels."""
-        test_file = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "test_files", "pass_with_data_matrix.pdf")
-        
-        if not os.path.exists(test_file):
-            pytest.skip(f"Test file not found: {test_file}")
-            
-        with open(test_file, 'rb') as f:
-            pdf_data = f.read()
-            
-        # Test different extraction methods work
-        from pdf2image import convert_from_bytes
-        from pyzbar import pyzbar
-        import cv2
-        import numpy as np
-        
-        # Test pdf2image conversion works
-        images = convert_from_bytes(pdf_data, dpi=400)
+        # Test pdf2image conversion works; the checks below only need a
+        # reasonably sized page, so 200 DPI (a quarter of 400's pixels) is enough.
+        # pyzbar reads luminance only, so have poppler emit 8-bit gray directly.
+        # The render is memoized (and kept on disk) by the shared test cache.
+        images = rasterize(data_matrix_pdf, 200, grayscale=True)
         assert len(images) >= 1, "Should convert to at least 1 image"
         
         # Test image can be processed
-        image = images[0]
-        cv_image = cv2.cvtColor(np.array(image), cv2.COLOR_RGB2BGR)
-        assert cv_image.shape[0] > 100 and cv_image.shape[1] > 100, "Image should be reasonable resolution"
-        
-        # Test pyzbar can run (even if it doesn't find anything)
-        gray = cv2.cvtColor(cv_image, cv2.COLOR_BGR2GRAY)
-        detected = pyzbar.decode(gray)  # This may return empty list, that's ok for this test
+        gray = np.asarray(images[0])
+        assert gray.shape[0] > 100 and gray.shape[1] > 100, "Image should be reasonable resolution"
         
-        print(f"DPI test: Converted PDF to {cv_image.shape} image, pyzbar found {len(detected)} barcodes")
+        # No raw pyzbar.decode here: that only exercises libzbar, and
+        # test_decode_with_formats_empty_image already runs it through our code
+        logger.debug("DPI test: Converted PDF to %s image", gray.shape)
     
     def test_barcode_preprocessing_methods(self):
         """Test different image preprocessing methods for barcode detection."""        
         # Test the preprocessing methods exist and work
-        blank_image = np.zeros((200, 200, 3), dtype=np.uint8)
+        blank_image = BLANK_200
         
-        # Test each preprocessing method
+        # BGR input is converted to gray
         contrast_result = self.extractor._enhance_contrast(blank_image)
         assert contrast_result.shape == (200, 200), "Contrast enhancement should return 2D array"
         
-        sharpness_result = self.extractor._enhance_sharpness(blank_image)
+        # The pipeline converts once and hands the same gray array to every method
+        gray_image = GRAY_200
+        
+        contrast_result = self.extractor._enhance_contrast(gray_image)
+        assert contrast_result.shape == (200, 200), "Contrast enhancement should return 2D array"
+        
+        sharpness_result = self.extractor._enhance_sharpness(gray_image)
         assert sharpness_result.shape == (200, 200), "Sharpness enhancement should return 2D array"
         
-        threshold_result = self.extractor._enhance_threshold(blank_image)
+        threshold_result = self.extractor._enhance_threshold(gray_image)
         assert threshold_result.shape == (200, 200), "Threshold should return 2D array"
         
-        morphology_result = self.extractor._enhance_morphology(blank_image)
+        morphology_result = self.extractor._enhance_morphology(gray_image)
         assert morphology_result.shape == (200, 200), "Morphology should return 2D array"
         
-        blur_result = self.extractor._enhance_gaussian_blur(blank_image)
+        blur_result = self.extractor._enhance_gaussian_blur(gray_image)
         assert blur_result.shape == (200, 200), "Blur should return 2D array"
+        
+        processed = self.extractor._preprocess_for_barcode_detection(gray_image)
+        assert processed['grayscale'] is gray_image, "Gray input should not be converted again"
     
     def test_no_barcode_returns_empty_list(self):
         """Test that no barcode scenario returns empty list without exceptions."""
         with patch('app.services.barcode_extractor.pyzbar.decode') as mock_decode:
             mock_decode.return_value = []  # No barcodes found
             
-            blank_image = np.zeros((100, 100, 3), dtype=np.uint8)
-            result = self.extractor.decode_with_formats(blank_image, {'AZTEC'})
+            blank_image = BLANK_100
+            result = self.extractor.decode_with_formats(blank_image, {'QRCODE'})
             
             assert result == []
     
     def test_try_formats_order(self):
         """Test that format groups are tried in correct order."""
         with patch.object(self.extractor, 'decode_with_formats') as mock_decode:
-            # Mock to return barcodes only for QR (third group)
-            def mock_decode_side_effect(image, formats, try_harder=True):
-                if 'QRCODE' in formats:
-                    return [{'type': 'QRCODE', 'data': 'qr_data'}]
-                return []
-            
-            mock_decode.side_effect = mock_decode_side_effect
+            # Return barcodes only for the QR group
+            mock_decode.side_effect = _fake_decode({'QRCODE': 'qr_data'})
             
-            blank_image = np.zeros((100, 100, 3), dtype=np.uint8)
+            blank_image = BLANK_100
             result = self.extractor._try_formats(blank_image, self.extractor.format_groups, 1, "test")
             
             # Should have called decode_with_formats for AZTEC first, then DATAMATRIX, then QRCODE
             assert mock_decode.call_count >= 3
             
-            # First call should be for AZTEC
-            first_call_formats = mock_decode.call_args_list[0][0][1]
-            assert first_call_formats == {'AZTEC'}
-            
-            # Second call should be for DATAMATRIX
-            second_call_formats = mock_decode.call_args_list[1][0][1]
-            assert second_call_formats == {'DATAMATRIX'}
+            # AZTEC first, then DATAMATRIX
+            calls = mock_decode.call_args_list
+            assert calls[0].args[1] == {'AZTEC'}
+            assert calls[1].args[1] == {'DATAMATRIX'}
             
             # Should return QR result since AZTEC and DATAMATRIX returned empty
             assert len(result) == 1
@@ -331,17 +303,10 @@ class TestBarcodeExtractor:
     def test_data_matrix_priority_over_qr(self):
         """Test that Data Matrix codes are prioritized over QR codes when both are present."""
         with patch.object(self.extractor, 'decode_with_formats') as mock_decode:
-            # Mock to return both Data Matrix and QR codes
-            def mock_decode_side_effect(image, formats, try_harder=True):
-                if 'DATAMATRIX' in formats:
-                    return [{'type': 'DATAMATRIX', 'data': 'datamatrix_data'}]
-                elif 'QRCODE' in formats:
-                    return [{'type': 'QRCODE', 'data': 'qr_data'}]
-                return []
-            
-            mock_decode.side_effect = mock_decode_side_effect
+            # Return both Data Matrix and QR codes
+            mock_decode.side_effect = _fake_decode({'DATAMATRIX': 'datamatrix_data', 'QRCODE': 'qr_data'})
             
-            blank_image = np.zeros((100, 100, 3), dtype=np.uint8)
+            blank_image = BLANK_100
             result = self.extractor._try_formats(blank_image, self.extractor.format_groups, 1, "test")
             
             # Should return Data Matrix result since it's tried before QR
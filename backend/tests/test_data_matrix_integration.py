@@ -0,0 +1,80 @@
+"""Integration tests for Data Matrix code detection in PDF files."""
+
+import sys
+import logging
+
+import pytest
+
+# Skip the whole module, not each test, when native zbar is missing
+pytest.importorskip("app.services.barcode_extractor", reason="barcode extraction needs native zbar")
+
+# Verbosity is up to pytest: run with --log-cli-level=DEBUG to see the details
+logger = logging.getLogger(__name__)
+
+
+def test_data_matrix_pdf_detection(barcode_extractor, data_matrix_barcodes):
+    """Test Data Matrix code detection with the provided test PDF."""
+    # Extracted once per session by the data_matrix_barcodes fixture
+    result = data_matrix_barcodes
+    
+    logger.info("✅ Found %d barcode(s)", len(result))
+    
+    if logger.isEnabledFor(logging.DEBUG):
+        for i, bc in enumerate(result, 1):
+            barcode_data = bc.get('data', 'unknown')
+            logger.debug("  %d. Type: %s", i, bc.get('type', 'unknown'))
+            logger.debug("     Format: %s", bc.get('format', 'unknown'))
+            logger.debug("     Data: %s%s", barcode_data[:100], '...' if len(barcode_data) > 100 else '')
+            logger.debug("     Encoding: %s", bc.get('encoding', 'unknown'))
+            logger.debug("     Method: %s", bc.get('method', 'unknown'))
+            logger.debug("     Source: %s", bc.get('source', 'unknown'))
+            logger.debug("     DPI: %s", bc.get('dpi', 'unknown'))
+            logger.debug("     Confidence: %s", bc.get('confidence', 'unknown'))
+            if 'bytes_b64' in bc:
+                logger.debug("     Base64 length: %d", len(bc['bytes_b64']))
+            if 'bbox' in bc:
+                logger.debug("     BBox: %s", bc['bbox'])
+    
+    types = {bc.get('type') for bc in result}
+    if 'DATAMATRIX' in types:
+        logger.info("🎯 ✅ DATA MATRIX CODE DETECTED!")
+    elif 'QRCODE' in types:
+        logger.warning("📱 QR code was found - this indicates Data Matrix might be misidentified")
+    
+    assert result, "no barcodes found in the Data Matrix sample"
+    # Every decoder must report the pipeline's type names (zxing says "DataMatrix")
+    assert types <= barcode_extractor.supported_formats, f"unnormalized types: {types}"
+    assert 'DATAMATRIX' in types, f"No Data Matrix code detected. Found types: {types}"
+
+
+@pytest.mark.parametrize("idx,expected", [
+    (0, {'AZTEC'}),       # Aztec first
+    (1, {'DATAMATRIX'}),  # then Data Matrix, before QR to avoid misidentification
+    (2, {'PDF417'}),      # then PDF417, which pyzbar sometimes reports as QR
+    (3, {'QRCODE'}),
+])
+def test_format_precedence(format_groups, idx, expected):
+    """Test that format groups are tried in the intended order."""
+    assert format_groups[idx] == expected
+
+
+def test_one_d_codes_last(format_groups):
+    """1D codes are the final format group."""
+    assert 'CODE128' in format_groups[-1]
+    assert len(format_groups) == 5
+
+
+def test_encoding_handling(barcode_extractor):
+    """Decoding an empty image returns no results for any 2D format."""
+    import numpy as np
+
+    # A tiny blank grayscale image is enough for the empty-result path
+    test_image = np.zeros((8, 8), dtype=np.uint8)
+
+    # Test with empty result for different formats (should not crash)
+    for format_type in ['AZTEC', 'DATAMATRIX', 'QRCODE']:
+        assert barcode_extractor.decode_with_formats(test_image, {format_type}) == []
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-v", "-s"]))
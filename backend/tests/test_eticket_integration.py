@@ -1,38 +1,62 @@
 """Integration test for eTicket.pdf to prevent regression issues."""
 
-import pytest
+import copy
 import os
+
+import pytest
+
+# Skip the whole module, not each test, when native zbar is missing
+pytest.importorskip("app.services.barcode_extractor", reason="barcode extraction needs native zbar")
+
 from app.services.pass_generator import pass_generator
 from app.services.barcode_extractor import barcode_extractor
+from tests._pdf_cache import read_pdf
+
+# eTicket.pdf takes seconds to rasterize: slow, like its PDF_CASES entry
+pytestmark = pytest.mark.slow
+
+TEST_FILES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "test_files")
+
+
+@pytest.fixture(scope="session")
+def eticket_pdf_path():
+    """Get path to eTicket.pdf test file."""
+    return os.path.join(TEST_FILES_DIR, "eTicket.pdf")
+
+
+@pytest.fixture(scope="session")
+def eticket_pdf_data(eticket_pdf_path):
+    """Load eTicket.pdf data once; bytes are immutable, so tests can share them."""
+    try:
+        return read_pdf(eticket_pdf_path)
+    except FileNotFoundError:
+        pytest.skip(f"eTicket.pdf not found at {eticket_pdf_path}")
+
+
+@pytest.fixture(scope="session")
+def eticket_barcodes(eticket_pdf_data):
+    """extract_barcodes_from_pdf result for eTicket.pdf, computed once; read-only."""
+    return barcode_extractor.extract_barcodes_from_pdf(eticket_pdf_data, "eTicket.pdf")
+
+
+@pytest.fixture(scope="session")
+def eticket_pass_result(eticket_pdf_data, eticket_barcodes):
+    """create_pass_from_pdf_data 4-tuple for eTicket.pdf (no AI metadata), computed once."""
+    # Reuse the extraction; a copy, since pass generation may annotate barcodes
+    return pass_generator.create_pass_from_pdf_data(
+        eticket_pdf_data,
+        "eTicket.pdf",
+        None,  # No AI metadata
+        barcodes=copy.deepcopy(eticket_barcodes)
+    )
 
 
 class TestETicketIntegration:
     """Test suite specifically for eTicket.pdf processing."""
 
-    @pytest.fixture
-    def eticket_pdf_path(self):
-        """Get path to eTicket.pdf test file."""
-        return os.path.join(
-            os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
-            "test_files",
-            "eTicket.pdf"
-        )
-
-    @pytest.fixture
-    def eticket_pdf_data(self, eticket_pdf_path):
-        """Load eTicket.pdf data."""
-        if not os.path.exists(eticket_pdf_path):
-            pytest.skip(f"eTicket.pdf not found at {eticket_pdf_path}")
-        
-        with open(eticket_pdf_path, 'rb') as f:
-            return f.read()
-
-    def test_eticket_barcode_extraction(self, eticket_pdf_data):
+    def test_eticket_barcode_extraction(self, eticket_barcodes):
         """Test that eTicket.pdf barcode extraction works correctly."""
-        barcodes = barcode_extractor.extract_barcodes_from_pdf(
-            eticket_pdf_data, 
-            "eTicket.pdf"
-        )
+        barcodes = eticket_barcodes
         
         # Should find exactly 1 unique barcode (duplicate QR codes deduplicated)
         assert len(barcodes) == 1, f"Expected 1 barcode, found {len(barcodes)}"
@@ -53,13 +77,9 @@ class TestETicketIntegration:
         assert 'pages_found' in barcode, "Barcode should have pages_found field"
         assert set(barcode['pages_found']) == {1, 2}, f"Expected pages [1, 2], got {barcode['pages_found']}"
 
-    def test_eticket_pass_generation(self, eticket_pdf_data):
+    def test_eticket_pass_generation(self, eticket_pass_result):
         """Test that eTicket.pdf generates exactly one pass."""
-        pkpass_files, detected_barcodes, ticket_info, warnings = pass_generator.create_pass_from_pdf_data(
-            eticket_pdf_data,
-            "eTicket.pdf",
-            None  # No AI metadata
-        )
+        pkpass_files, detected_barcodes, ticket_info, warnings = eticket_pass_result
         
         # Should generate exactly 1 pass file
         assert len(pkpass_files) == 1, f"Expected 1 pass file, got {len(pkpass_files)}"
@@ -87,13 +107,9 @@ class TestETicketIntegration:
         assert 'detection_count' in barcode, "Barcode should have detection_count"
         assert barcode['detection_count'] == 2, f"Expected detection_count of 2, got {barcode['detection_count']}"
 
-    def test_eticket_spanish_text_handling(self, eticket_pdf_data):
+    def test_eticket_spanish_text_handling(self, eticket_pass_result):
         """Test that Spanish text and date formats are handled correctly."""
-        pkpass_files, detected_barcodes, ticket_info, warnings = pass_generator.create_pass_from_pdf_data(
-            eticket_pdf_data,
-            "eTicket.pdf",
-            None
-        )
+        pkpass_files, detected_barcodes, ticket_info, warnings = eticket_pass_result
         
         ticket = ticket_info[0]
         
@@ -107,12 +123,9 @@ class TestETicketIntegration:
         # Check that Spanish text doesn't break the processing
         # (No specific assertions needed since successful pass generation proves it works)
         
-    def test_eticket_qr_code_data_format(self, eticket_pdf_data):
+    def test_eticket_qr_code_data_format(self, eticket_barcodes):
         """Test that QR code data from eTicket.pdf is in the correct format."""
-        barcodes = barcode_extractor.extract_barcodes_from_pdf(
-            eticket_pdf_data,
-            "eTicket.pdf"
-        )
+        barcodes = eticket_barcodes
         
         barcode = barcodes[0]
         barcode_data = barcode['data']
@@ -126,36 +139,19 @@ class TestETicketIntegration:
         # Should contain the operation number from the PDF (25063439)
         assert '25063439' in barcode_data, f"Barcode should contain operation number, data: {barcode_data[:50]}..."
 
-    def test_eticket_end_to_end_processing(self, eticket_pdf_data):
+    def test_eticket_end_to_end_processing(self, eticket_pass_result):
         """End-to-end test that eTicket.pdf processes without any errors."""
-        try:
-            # This should not raise any exceptions
-            pkpass_files, detected_barcodes, ticket_info, warnings = pass_generator.create_pass_from_pdf_data(
-                eticket_pdf_data,
-                "eTicket.pdf",
-                None
-            )
-            
-            # Verify we got expected results
-            assert len(pkpass_files) == 1
-            assert len(detected_barcodes) == 1  
-            assert len(ticket_info) == 1
-            
-            # Verify no critical warnings
-            if warnings:
-                # Allow warnings but not errors
-                for warning in warnings:
-                    assert "error" not in warning.lower(), f"Unexpected error in warnings: {warning}"
-            
-        except Exception as e:
-            pytest.fail(f"eTicket.pdf processing failed: {str(e)}")
-
-    def test_eticket_barcode_encoding(self, eticket_pdf_data):
+        # Processing errors surface when the eticket_pass_result fixture runs,
+        # and test_eticket_pass_generation checks the counts
+        warnings = eticket_pass_result[3]
+        
+        # Allow warnings but not errors
+        for warning in warnings:
+            assert "error" not in warning.lower(), f"Unexpected error in warnings: {warning}"
+
+    def test_eticket_barcode_encoding(self, eticket_barcodes):
         """Test that barcode encoding is handled correctly for eTicket.pdf."""
-        barcodes = barcode_extractor.extract_barcodes_from_pdf(
-            eticket_pdf_data,
-            "eTicket.pdf"
-        )
+        barcodes = eticket_barcodes
         
         barcode = barcodes[0]
         
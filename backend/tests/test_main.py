@@ -2,67 +2,80 @@ import pytest
 from fastapi.testclient import TestClient
 from app.main import app
 import io
+import os
 from PyPDF2 import PdfWriter
 
+from tests._pdf_cache import read_pdf
+
+# Created once and never entered as a context manager: entering it would run
+# the app's shutdown hook, which empties the uploads directory
 client = TestClient(app)
 
-def create_test_pdf():
-    """Create a simple test PDF in memory."""
+HEADERS = {"X-API-Key": "development-api-key"}
+INVALID_HEADERS = {"X-API-Key": "invalid-key"}
+UPLOAD_DATA = {
+    "user_id": "test-user",
+    "session_token": "test-token"
+}
+
+TEST_FILES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "test_files")
+
+@pytest.fixture(scope="module", autouse=True)
+def api_key_env():
+    """The API key the upload tests send, set once for the module."""
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv("API_KEY", "development-api-key")
+        yield
+
+@pytest.fixture(scope="session")
+def eticket_pdf():
+    """Bytes of test_files/eTicket.pdf, read once per session."""
+    path = os.path.join(TEST_FILES_DIR, "eTicket.pdf")
+    try:
+        return read_pdf(path)
+    except FileNotFoundError:
+        pytest.skip(f"eTicket.pdf test file not found: {path}")
+
+@pytest.fixture(scope="session")
+def blank_pdf_bytes():
+    """A one-page blank PDF, built once per session."""
     pdf_writer = PdfWriter()
     pdf_writer.add_blank_page(width=200, height=200)
     
     pdf_bytes = io.BytesIO()
     pdf_writer.write(pdf_bytes)
-    pdf_bytes.seek(0)
     return pdf_bytes.getvalue()
 
+@pytest.fixture(scope="module")
+def blank_pdf_upload(blank_pdf_bytes):
+    """Response to uploading the blank PDF, shared by the tests that need a job."""
+    files = {"file": ("test.pdf", blank_pdf_bytes, "application/pdf")}
+    return client.post("/upload", files=files, data=UPLOAD_DATA, headers=HEADERS)
+
 def test_root():
     response = client.get("/")
     assert response.status_code == 200
     assert response.json()["message"] == "Add2Wallet API is running"
 
-def test_upload_pdf_success():
-    pdf_content = create_test_pdf()
-    
-    files = {"file": ("test.pdf", pdf_content, "application/pdf")}
-    data = {
-        "user_id": "test-user",
-        "session_token": "test-token"
-    }
-    headers = {"X-API-Key": "development-api-key"}
-    
-    response = client.post("/upload", files=files, data=data, headers=headers)
+def test_upload_pdf_success(blank_pdf_upload):
+    response = blank_pdf_upload
     
     assert response.status_code == 200
     json_response = response.json()
     assert "job_id" in json_response
     assert json_response["status"] in ["processing", "completed"]
 
-def test_upload_data_matrix_pdf_integration():
+def test_upload_data_matrix_pdf_integration(data_matrix_pdf):
     """Test uploading the actual Data Matrix PDF through the API."""
-    import os
-    
-    # Ensure API key is set for test
-    os.environ["API_KEY"] = "development-api-key"
-    
-    # Path to the test Data Matrix PDF
-    test_file = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "test_files", "pass_with_data_matrix.pdf")
-    
-    if not os.path.exists(test_file):
-        pytest.skip(f"Data Matrix test file not found: {test_file}")
-    
-    # Read the test PDF
-    with open(test_file, 'rb') as f:
-        pdf_content = f.read()
+    pdf_content = data_matrix_pdf
     
     files = {"file": ("pass_with_data_matrix.pdf", pdf_content, "application/pdf")}
     data = {
         "user_id": "test-user-datamatrix",
         "session_token": "test-token-datamatrix"
     }
-    headers = {"X-API-Key": "development-api-key"}
     
-    response = client.post("/upload", files=files, data=data, headers=headers)
+    response = client.post("/upload", files=files, data=data, headers=HEADERS)
     
     assert response.status_code == 200
     json_response = response.json()
@@ -79,7 +92,7 @@ def test_upload_data_matrix_pdf_integration():
         
         # Test downloading the tickets
         job_id = json_response["job_id"]
-        tickets_response = client.get(f"/tickets/{job_id}", headers=headers)
+        tickets_response = client.get(f"/tickets/{job_id}", headers=HEADERS)
         assert tickets_response.status_code == 200
         
         tickets_data = tickets_response.json()
@@ -93,46 +106,27 @@ def test_upload_data_matrix_pdf_integration():
                 assert "barcode_type" in ticket
                 print(f"  Ticket: {ticket.get('title', 'N/A')} - {ticket.get('barcode_type', 'N/A')}")
 
-def test_upload_pdf_invalid_api_key():
-    pdf_content = create_test_pdf()
+def test_upload_pdf_invalid_api_key(blank_pdf_bytes):
+    pdf_content = blank_pdf_bytes
     
     files = {"file": ("test.pdf", pdf_content, "application/pdf")}
-    data = {
-        "user_id": "test-user",
-        "session_token": "test-token"
-    }
-    headers = {"X-API-Key": "invalid-key"}
     
-    response = client.post("/upload", files=files, data=data, headers=headers)
+    response = client.post("/upload", files=files, data=UPLOAD_DATA, headers=INVALID_HEADERS)
     
     assert response.status_code == 401
     assert response.json()["detail"] == "Invalid API key"
 
 def test_upload_non_pdf_file():
     files = {"file": ("test.txt", b"Not a PDF", "text/plain")}
-    data = {
-        "user_id": "test-user",
-        "session_token": "test-token"
-    }
-    headers = {"X-API-Key": "development-api-key"}
     
-    response = client.post("/upload", files=files, data=data, headers=headers)
+    response = client.post("/upload", files=files, data=UPLOAD_DATA, headers=HEADERS)
     
     assert response.status_code == 400
     assert "Only PDF files are allowed" in response.json()["detail"]
 
-def test_get_status():
-    # First upload a PDF
-    pdf_content = create_test_pdf()
-    files = {"file": ("test.pdf", pdf_content, "application/pdf")}
-    data = {
-        "user_id": "test-user",
-        "session_token": "test-token"
-    }
-    headers = {"X-API-Key": "development-api-key"}
-    
-    upload_response = client.post("/upload", files=files, data=data, headers=headers)
-    job_id = upload_response.json()["job_id"]
+def test_get_status(blank_pdf_upload):
+    # The same upload test_upload_pdf_success checks; only the status lookup is new
+    job_id = blank_pdf_upload.json()["job_id"]
     
     # Check status
     status_response = client.get(f"/status/{job_id}")
@@ -148,31 +142,20 @@ def test_get_status_invalid_job():
     assert response.status_code == 404
     assert response.json()["detail"] == "Job not found"
 
-def test_upload_eticket_pdf_integration():
+@pytest.mark.slow  # eTicket.pdf takes seconds to rasterize
+def test_upload_eticket_pdf_integration(eticket_pdf):
     """Test uploading the actual eTicket.pdf through the API."""
-    import os
-    
-    # Ensure API key is set for test
-    os.environ["API_KEY"] = "development-api-key"
-    
-    # Path to the test eTicket.pdf
-    test_file = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "test_files", "eTicket.pdf")
-    
-    if not os.path.exists(test_file):
-        pytest.skip(f"eTicket.pdf test file not found: {test_file}")
-    
-    # Read the test PDF
-    with open(test_file, 'rb') as f:
-        pdf_content = f.read()
+    # Skip cheaply instead of failing mid-upload when native zbar is missing
+    pytest.importorskip("app.services.barcode_extractor", reason="barcode extraction needs native zbar")
+    pdf_content = eticket_pdf
     
     files = {"file": ("eTicket.pdf", pdf_content, "application/pdf")}
     data = {
         "user_id": "test-user-eticket",
         "session_token": "test-token-eticket"
     }
-    headers = {"X-API-Key": "development-api-key"}
     
-    response = client.post("/upload", files=files, data=data, headers=headers)
+    response = client.post("/upload", files=files, data=data, headers=HEADERS)
     
     assert response.status_code == 200
     json_response = response.json()
@@ -189,7 +172,7 @@ def test_upload_eticket_pdf_integration():
         
         # Test downloading the tickets
         job_id = json_response["job_id"]
-        tickets_response = client.get(f"/tickets/{job_id}", headers=headers)
+        tickets_response = client.get(f"/tickets/{job_id}", headers=HEADERS)
         assert tickets_response.status_code == 200
         
         tickets_data = tickets_response.json()
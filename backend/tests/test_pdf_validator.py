@@ -3,50 +3,48 @@ from app.services.pdf_validator import PDFValidator
 from PyPDF2 import PdfWriter
 import io
 
-def create_valid_pdf():
-    """Create a valid test PDF."""
-    pdf_writer = PdfWriter()
-    pdf_writer.add_blank_page(width=200, height=200)
-    
+@pytest.fixture(scope="module")
+def validator():
+    # Stateless, so one instance serves every test
+    return PDFValidator()
+
+def _write_pdf(pdf_writer):
     pdf_bytes = io.BytesIO()
     pdf_writer.write(pdf_bytes)
-    pdf_bytes.seek(0)
     return pdf_bytes.getvalue()
 
-def test_validate_valid_pdf():
-    validator = PDFValidator()
-    pdf_content = create_valid_pdf()
-    
-    is_valid, error = validator.validate(pdf_content)
+@pytest.fixture(scope="session")
+def valid_pdf_bytes():
+    """A valid one-page test PDF."""
+    pdf_writer = PdfWriter()
+    pdf_writer.add_blank_page(width=200, height=200)
+    return _write_pdf(pdf_writer)
+
+@pytest.fixture(scope="session")
+def empty_pdf_bytes():
+    """A structurally valid PDF with no pages."""
+    return _write_pdf(PdfWriter())
+
+def test_validate_valid_pdf(validator, valid_pdf_bytes):
+    is_valid, error = validator.validate(valid_pdf_bytes)
     
     assert is_valid is True
     assert error == ""
 
-def test_validate_empty_content():
-    validator = PDFValidator()
-    
+def test_validate_empty_content(validator):
     is_valid, error = validator.validate(b"")
     
     assert is_valid is False
     assert "PDF file is empty" in error
 
-def test_validate_invalid_pdf():
-    validator = PDFValidator()
-    
+def test_validate_invalid_pdf(validator):
     is_valid, error = validator.validate(b"This is not a PDF")
     
     assert is_valid is False
     assert "Invalid PDF format" in error or "Error validating PDF" in error
 
-def test_validate_pdf_with_no_pages():
-    validator = PDFValidator()
-    pdf_writer = PdfWriter()
-    
-    pdf_bytes = io.BytesIO()
-    pdf_writer.write(pdf_bytes)
-    pdf_bytes.seek(0)
-    
-    is_valid, error = validator.validate(pdf_bytes.getvalue())
+def test_validate_pdf_with_no_pages(validator, empty_pdf_bytes):
+    is_valid, error = validator.validate(empty_pdf_bytes)
     
     assert is_valid is False
-    assert "PDF has no pages" in error
\ No newline at end of file
+    assert "PDF has no pages" in error
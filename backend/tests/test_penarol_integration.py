@@ -13,7 +13,10 @@ import zipfile
 
 import pytest
 
-from app.services.barcode_extractor import BarcodeExtractor
+# Skip the whole module, not each test, when native zbar is missing
+pytest.importorskip("app.services.barcode_extractor", reason="barcode extraction needs native zbar")
+
+from app.services.barcode_extractor import barcode_extractor
 from app.services.pass_generator import PassGenerator
 
 # ---------------------------------------------------------------------------
@@ -35,6 +38,12 @@ def _load(filename: str) -> bytes:
         return f.read()
 
 
+@pytest.fixture(scope="module")
+def extractor():
+    """The app's extractor singleton, shared by every class below."""
+    return barcode_extractor
+
+
 def _pass_json(pkpass_bytes: bytes) -> dict:
     """Extract pass.json from a .pkpass (zip) file."""
     with zipfile.ZipFile(io.BytesIO(pkpass_bytes)) as z:
@@ -49,10 +58,6 @@ def _pass_json(pkpass_bytes: bytes) -> dict:
 class TestPenarolBarcodeExtraction:
     """pyzbar cannot read the Peñarol PDF417; zxing-cpp must pick it up."""
 
-    @pytest.fixture(scope="class")
-    def extractor(self):
-        return BarcodeExtractor()
-
     @pytest.fixture(scope="class")
     def barcodes(self, extractor):
         data = _load("12-Penarol.pdf")
@@ -146,10 +151,6 @@ class TestPenarolPassGeneration:
 class TestOtherPDF417Files:
     """Other PDFs with PDF417 barcodes should also produce the correct format."""
 
-    @pytest.fixture(scope="class")
-    def extractor(self):
-        return BarcodeExtractor()
-
     @pytest.mark.parametrize("filename", [
         "2-AbuDhabi-Madrid.pdf",
         "7-Madrid-Medellin.pdf",
@@ -172,10 +173,6 @@ class TestOtherPDF417Files:
 class TestNoRegressions:
     """QR-based PDFs must still produce QR barcodes."""
 
-    @pytest.fixture(scope="class")
-    def extractor(self):
-        return BarcodeExtractor()
-
     @pytest.mark.parametrize("filename,expected_count,expected_type", [
         ("13-Oppenheimer.pdf", 1, "QRCODE"),
         ("6-Cine-Gladiador.pdf", 1, "QRCODE"),
@@ -0,0 +1,74 @@
+"""Tests for the RevenueCat circuit breaker.
+
+These tests verify:
+1. Consecutive network failures open the circuit and short-circuit calls
+2. A successful response resets the failure count
+3. Rate limiting left after retries counts as a failure; other 4xx are neutral
+"""
+import os
+import sys
+from unittest.mock import patch, MagicMock
+
+import requests
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.services.revenuecat_service import RevenueCatService, BREAKER_FAILURE_THRESHOLD
+
+
+class TestRevenueCatCircuitBreaker:
+
+    def setup_method(self):
+        with patch.dict(os.environ, {"REVENUECAT_SECRET_KEY": "sk_test_circuitbreaker"}):
+            self.service = RevenueCatService()
+
+    def test_opens_after_consecutive_network_failures(self):
+        with patch.object(
+            self.service.session, "post",
+            side_effect=requests.exceptions.ConnectionError("down"),
+        ) as mock_post:
+            for _ in range(BREAKER_FAILURE_THRESHOLD + 3):
+                assert self.service.deduct_pass("user-1") == (True, None)
+
+        assert mock_post.call_count == BREAKER_FAILURE_THRESHOLD
+        with patch.object(self.service.session, "get") as mock_get:
+            assert self.service.get_balance("user-1") is None
+            mock_get.assert_not_called()
+
+    def test_success_resets_failure_count(self):
+        ok = MagicMock(status_code=200, text="{}")
+        ok.json.return_value = {"items": [{"currency_code": "PASS", "balance": 4}]}
+
+        with patch.object(
+            self.service.session, "post",
+            side_effect=[requests.exceptions.ConnectionError("down")] * (BREAKER_FAILURE_THRESHOLD - 1) + [ok],
+        ):
+            for _ in range(BREAKER_FAILURE_THRESHOLD - 1):
+                self.service.deduct_pass("user-1")
+            assert self.service.deduct_pass("user-1") == (True, 4)
+
+        assert self.service._breaker["failures"] == 0
+        assert not self.service._breaker_open()
+
+    def test_rate_limited_responses_open_the_circuit(self):
+        limited = MagicMock(status_code=429, text="rate limited")
+
+        with patch.object(self.service.session, "post", return_value=limited) as mock_post:
+            for _ in range(BREAKER_FAILURE_THRESHOLD + 2):
+                self.service.deduct_pass("user-1")
+
+        assert mock_post.call_count == BREAKER_FAILURE_THRESHOLD
+        assert self.service._breaker_open()
+
+    def test_client_errors_do_not_reset_failure_count(self):
+        insufficient = MagicMock(status_code=422, text="insufficient balance")
+
+        with patch.object(
+            self.service.session, "post",
+            side_effect=[requests.exceptions.ConnectionError("down"), insufficient],
+        ):
+            self.service.deduct_pass("user-1")
+            assert self.service.deduct_pass("user-1") == (False, None)
+
+        assert self.service._breaker["failures"] == 1
@@ -0,0 +1,60 @@
+"""Tests for the v2 AI extractor's concurrent batch extraction."""
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.services.v2 import ai_extractor as ai_module
+from app.services.v2.ai_extractor import AIExtractor
+from app.services.v2.models import PDFExtraction
+
+
+def _parse_response(**kwargs):
+    """Mocked parse(): a parsed result titled after the prompt's filename."""
+    prompt = kwargs["messages"][-1]["content"]
+    filename = prompt.split("DOCUMENT FILENAME: ", 1)[1].split("\n", 1)[0]
+    parsed = PDFExtraction(document_type="event_ticket", title=filename, confidence=90)
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(parsed=parsed))])
+
+
+@pytest.fixture
+def extractor():
+    extractor = AIExtractor(api_key="test-key")
+    extractor._use_parse = True
+    extractor._aclient = MagicMock()
+    extractor._aclient.beta.chat.completions.parse = AsyncMock(side_effect=_parse_response)
+    return extractor
+
+
+def test_async_client_is_created_lazily():
+    extractor = AIExtractor(api_key="test-key")
+    assert extractor._aclient is None
+
+    client = extractor._async_client()
+    assert client is extractor._async_client()
+
+
+@pytest.mark.asyncio
+async def test_extract_many_returns_results_in_job_order(extractor):
+    jobs = [("text", "first"), ("text", "second"), ("text", "third")]
+
+    results = await extractor.extract_many(jobs)
+
+    assert [r.title for r in results] == ["first", "second", "third"]
+
+
+@pytest.mark.asyncio
+async def test_extract_many_returns_exception_in_its_slot(extractor, monkeypatch):
+    failure = ValueError("fallback failed")
+
+    async def aextract(text, filename):
+        if filename == "bad":
+            raise failure
+        return ai_module._heuristic_extract(text, filename)
+
+    monkeypatch.setattr(extractor, "_aextract", aextract)
+
+    results = await extractor.extract_many([("", "good one"), ("", "bad"), ("", "also good")])
+
+    assert results[1] is failure
+    assert [results[0].title, results[2].title] == ["good one", "also good"]
@@ -0,0 +1,46 @@
+"""Tests for the v2 color extractor's per-PDF result cache."""
+from collections import OrderedDict
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.services.v2 import color_extractor
+
+
+@pytest.fixture
+def fake_extract(monkeypatch):
+    """Empty cache and a stubbed rasterizing step that counts calls."""
+    monkeypatch.setattr(color_extractor, "_extraction_cache", OrderedDict())
+    extract = MagicMock(return_value=("rgb(200, 30, 30)", None, None))
+    monkeypatch.setattr(color_extractor, "_extract_from_pdf", extract)
+    return extract
+
+
+def test_repeated_pdf_is_served_from_cache(fake_extract):
+    first = color_extractor._extract_from_pdf_cached(b"%PDF-same")
+    second = color_extractor._extract_from_pdf_cached(b"%PDF-same")
+
+    assert first == second == ("rgb(200, 30, 30)", None, None)
+    assert fake_extract.call_count == 1
+
+
+def test_cache_stays_within_maxsize(fake_extract, monkeypatch):
+    monkeypatch.setattr(color_extractor, "_CACHE_MAXSIZE", 4)
+
+    for i in range(10):
+        color_extractor._extract_from_pdf_cached(b"PDF-%d" % i)
+
+    assert len(color_extractor._extraction_cache) == 4
+    # Oldest entries were evicted, so the first PDF is extracted again
+    color_extractor._extract_from_pdf_cached(b"PDF-0")
+    assert fake_extract.call_count == 11
+
+
+def test_failed_extraction_is_not_cached(fake_extract):
+    fake_extract.return_value = (None, None, None)
+
+    color_extractor._extract_from_pdf_cached(b"PDF-broken")
+    color_extractor._extract_from_pdf_cached(b"PDF-broken")
+
+    assert fake_extract.call_count == 2
+    assert not color_extractor._extraction_cache
@@ -0,0 +1,34 @@
+"""Tests for the v2 pass validator's ISO 8601 date check."""
+import pytest
+
+from app.services.v2.pass_validator import _valid_iso8601
+
+
+@pytest.mark.parametrize("value", [
+    "2024-01-01",
+    "2024-01-01T10:30",
+    "2024-01-01T10:30:00",
+    "2024-01-01T10:30:00.123",
+    "2024-01-01T10:30Z",
+    "2024-01-01T10:30:00+05:30",
+    "2024-02-29T23:59:59-08:00",
+])
+def test_valid_iso8601_accepts_wallet_forms(value):
+    assert _valid_iso8601(value)
+
+
+@pytest.mark.parametrize("value", [
+    "2024-01-01T10",             # hour only
+    "2024-01-01T1030",           # basic time
+    "2024-01-01T10:30+0530",     # offset without colon
+    "2024-01-01T10:30:00+05",    # hour-only offset
+    "2024-13-40",                # impossible date
+    "2023-02-29",                # not a leap year
+    "2024-01-01T25:00",          # impossible time
+    "20240101",                  # basic date
+    "2024-01-01 10:30",          # space separator
+    "2024-01-01T10:30:00Z\n",
+    "",
+])
+def test_valid_iso8601_rejects_other_forms(value):
+    assert not _valid_iso8601(value)